@@ -2,18 +2,24 @@ import os
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
 from models import db
-from services.rawg_service import cache
+from services.password_service import PasswordHashingBusy
+from services.rawg_service import cache, RAWGService
 from config import Config
+from cli import register_commands
 from routes.auth import auth_bp
 from routes.wishlist import wishlist_bp
 from routes.games import games_bp
 
-def create_app():
+migrate = Migrate(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+
+def create_app(config_object=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_object)
     
     db.init_app(app)
+    migrate.init_app(app, db)
     cache.init_app(app)
     
     allowed_origins = [
@@ -53,17 +59,23 @@ def create_app():
     app.register_blueprint(auth_bp)
     app.register_blueprint(wishlist_bp)
     app.register_blueprint(games_bp)
+    register_commands(app)
+    
+    @app.errorhandler(PasswordHashingBusy)
+    def handle_password_hashing_busy(e):
+        return {'error': 'Server busy', 'message': str(e)}, 503, {'Retry-After': '1'}
     
     @app.errorhandler(422)
     def handle_unprocessable_entity(e):
         return {'error': 'Unprocessable Entity', 'message': str(e)}, 422
     
-    with app.app_context():
-        db.create_all()
-    
     @app.route('/api/health', methods=['GET'])
     def health_check():
-        return {'status': 'healthy', 'message': 'GameScout API is running'}, 200
+        return {
+            'status': 'healthy',
+            'message': 'GameScout API is running',
+            'rawg': RAWGService.get_stats()
+        }, 200
     
     return app
 
@@ -6,5 +6,5 @@ set -o errexit
 pip install --upgrade pip
 pip install -r requirements.txt
 
-# Initialize database tables
-python -c "from app import create_app; app = create_app(); print('Database tables created successfully!')"
+# Create or upgrade database tables
+FLASK_APP=app flask db upgrade
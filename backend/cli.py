@@ -0,0 +1,49 @@
+import click
+from flask.cli import AppGroup
+from services.catalog_service import CatalogService
+from services.rate_limiter import PRIORITY_BULK
+from services.rawg_service import RAWGService
+from services.recommendation_service import RecommendationService
+from services.similarity_service import SimilarityService
+
+catalog_cli = AppGroup('catalog', help='Manage the local RAWG catalog mirror.')
+recommendations_cli = AppGroup('recommendations', help='Manage precomputed recommendations.')
+
+
+@catalog_cli.command('sync')
+@click.option('--max-pages', type=int, default=None, help='Stop after this many pages; the next run resumes.')
+@click.option('--full', is_flag=True, help='Resync the whole catalog instead of only updated games.')
+def sync_catalog(max_pages, full):
+    """Mirror games updated on RAWG since the last sync into catalog_games."""
+    result = CatalogService.sync(
+        lambda params: RAWGService._request('/games', params, priority=PRIORITY_BULK),
+        max_pages=max_pages,
+        full=full
+    )
+    status = 'complete' if result['complete'] else 'checkpointed'
+    click.echo(f"Synced {result['games']} games from {result['pages']} pages ({status})")
+
+
+@recommendations_cli.command('precompute')
+@click.option('--chunk-size', type=int, default=None, help='Users loaded and stored per batch.')
+def precompute_recommendations(chunk_size):
+    """Compute every user's first page of recommendations into precomputed_recommendations."""
+    result = RecommendationService.precompute(chunk_size=chunk_size)
+    click.echo(
+        f"Stored recommendations for {result['stored']} users ({result['skipped']} skipped); "
+        f"{result['searches_sent']} of {result['searches_requested']} searches sent to RAWG"
+    )
+
+
+@recommendations_cli.command('similarities')
+@click.option('--full', is_flag=True, help='Recompute every game instead of only changed collections.')
+def rebuild_similarities(full):
+    """Rebuild the co-saved games behind the collaborative recommendation feed."""
+    result = SimilarityService.rebuild(full=full)
+    mode = 'full' if result['full'] else 'incremental'
+    click.echo(f"Stored {result['pairs']} similar games for {result['games']} games ({mode})")
+
+
+def register_commands(app):
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(recommendations_cli)
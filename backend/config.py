@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +17,75 @@ class Config:
     
     RAWG_API_KEY = os.getenv('RAWG_API_KEY', '')
     RAWG_BASE_URL = 'https://api.rawg.io/api'
+    RAWG_TIMEOUT = float(os.getenv('RAWG_TIMEOUT', 10))  # per attempt
+    RAWG_CALL_TIMEOUT = float(os.getenv('RAWG_CALL_TIMEOUT', 20))  # per call, retries and backoff included
+    RAWG_POOL_SIZE = int(os.getenv('RAWG_POOL_SIZE', 10))
+    RAWG_MAX_RETRIES = int(os.getenv('RAWG_MAX_RETRIES', 3))
+    RAWG_BACKOFF_FACTOR = float(os.getenv('RAWG_BACKOFF_FACTOR', 0.5))
+    RAWG_BACKOFF_JITTER = float(os.getenv('RAWG_BACKOFF_JITTER', 0.25))
+    RAWG_FANOUT_WORKERS = int(os.getenv('RAWG_FANOUT_WORKERS', 8))
+    RAWG_BREAKER_WINDOW = int(os.getenv('RAWG_BREAKER_WINDOW', 20))
+    RAWG_BREAKER_FAILURE_RATE = float(os.getenv('RAWG_BREAKER_FAILURE_RATE', 0.5))
+    RAWG_BREAKER_MIN_CALLS = int(os.getenv('RAWG_BREAKER_MIN_CALLS', 10))
+    RAWG_BREAKER_RESET_TIMEOUT = float(os.getenv('RAWG_BREAKER_RESET_TIMEOUT', 30))
+    RAWG_RATE_LIMIT = float(os.getenv('RAWG_RATE_LIMIT', 5))  # tokens per second, 0 disables
+    RAWG_RATE_BURST = int(os.getenv('RAWG_RATE_BURST', 20))
+    RAWG_RATE_LIMIT_DB = os.getenv('RAWG_RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'gamescout-ratelimit.sqlite3'))
+    RAWG_RATE_MAX_WAIT_INTERACTIVE = float(os.getenv('RAWG_RATE_MAX_WAIT_INTERACTIVE', 5))
+    RAWG_RATE_MAX_WAIT_DEFAULT = float(os.getenv('RAWG_RATE_MAX_WAIT_DEFAULT', 2))
+    RAWG_RATE_MAX_WAIT_BULK = float(os.getenv('RAWG_RATE_MAX_WAIT_BULK', 60))
+    RAWG_SEARCH_SOURCE = os.getenv('RAWG_SEARCH_SOURCE', 'api')  # 'api' or 'catalog'
+    CATALOG_SYNC_PAGE_SIZE = int(os.getenv('CATALOG_SYNC_PAGE_SIZE', 40))
+    CATALOG_SEARCH_COUNT_LIMIT = int(os.getenv('CATALOG_SEARCH_COUNT_LIMIT', 1000))  # counts stop here
     
-    CACHE_TYPE = 'SimpleCache'
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'services.tiered_cache.TieredCache')
     CACHE_DEFAULT_TIMEOUT = 21600
+    CACHE_L1_THRESHOLD = int(os.getenv('CACHE_L1_THRESHOLD', 500))
+    CACHE_L1_TIMEOUT = int(os.getenv('CACHE_L1_TIMEOUT', 60))
+    CACHE_L2_TYPE = os.getenv('CACHE_L2_TYPE', 'FileSystemCache')
+    CACHE_L2_THRESHOLD = int(os.getenv('CACHE_L2_THRESHOLD', 10000))
+    CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'gamescout-cache'))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', '')
+    RAWG_SEARCH_CACHE_TIMEOUT = int(os.getenv('RAWG_SEARCH_CACHE_TIMEOUT', 3600))
+    RAWG_SWR_ENABLED = os.getenv('RAWG_SWR_ENABLED', 'true').lower() == 'true'
+    RAWG_SWR_STALE_TTL = int(os.getenv('RAWG_SWR_STALE_TTL', 86400))
+    RAWG_SWR_REFRESH_WORKERS = int(os.getenv('RAWG_SWR_REFRESH_WORKERS', 2))
+    RAWG_STALE_IF_ERROR_TTL = int(os.getenv('RAWG_STALE_IF_ERROR_TTL', 259200))
+    RAWG_ERROR_CACHE_TIMEOUT = int(os.getenv('RAWG_ERROR_CACHE_TIMEOUT', 60))
+    
+    CONTENT_FILTER_KEYWORDS = os.getenv(
+        'CONTENT_FILTER_KEYWORDS',
+        'nsfw,adult,xxx,sex,porn,hentai,nude,naked,bdsm,milf,fap,tits,ass,sexy,erotic,18+'
+    ).split(',')
+    CONTENT_FILTER_TAGS = os.getenv(
+        'CONTENT_FILTER_TAGS', 'nsfw,sexual-content,nudity,hentai,erotic,adult'
+    ).split(',')
+    CONTENT_FILTER_ESRB_RATINGS = os.getenv('CONTENT_FILTER_ESRB_RATINGS', 'adults-only').split(',')
+    CONTENT_FILTER_CACHE_SIZE = int(os.getenv('CONTENT_FILTER_CACHE_SIZE', 10000))
+    
+    TAXONOMY_INDEX_TTL = int(os.getenv('TAXONOMY_INDEX_TTL', 600))  # in-memory lookup indexes
+    
+    RECOMMENDATION_DEADLINE = float(os.getenv('RECOMMENDATION_DEADLINE', 8))
+    RECOMMENDATION_CACHE_TIMEOUT = int(os.getenv('RECOMMENDATION_CACHE_TIMEOUT', 3600))
+    RECOMMENDATION_CACHE_PAGES = int(os.getenv('RECOMMENDATION_CACHE_PAGES', 5))
+    RECOMMENDATION_PRECOMPUTE_MAX_AGE = int(os.getenv('RECOMMENDATION_PRECOMPUTE_MAX_AGE', 86400))
+    RECOMMENDATION_PRECOMPUTE_CHUNK_SIZE = int(os.getenv('RECOMMENDATION_PRECOMPUTE_CHUNK_SIZE', 200))
+    SIMILARITY_TOP_N = int(os.getenv('SIMILARITY_TOP_N', 20))
+    COLLABORATIVE_FEED_SIZE = int(os.getenv('COLLABORATIVE_FEED_SIZE', 10))
+    PLAYED_IDS_CACHE_TIMEOUT = int(os.getenv('PLAYED_IDS_CACHE_TIMEOUT', 3600))
+    RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 3600))
+    TAXONOMY_RESPONSE_MAX_AGE = int(os.getenv('TAXONOMY_RESPONSE_MAX_AGE', 3600))  # /genres and /platforms Cache-Control
+    GAME_DETAILS_MAX_AGE = int(os.getenv('GAME_DETAILS_MAX_AGE', 600))
+    
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 4))  # per host, across workers
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 0))  # waiting holds the worker
+    PASSWORD_HASH_LEASE_TIMEOUT = float(os.getenv('PASSWORD_HASH_LEASE_TIMEOUT', 30))
+    PASSWORD_HASH_SLOTS_DB = os.getenv('PASSWORD_HASH_SLOTS_DB', os.path.join(tempfile.gettempdir(), 'gamescout-password-slots.sqlite3'))
+    
+    WISHLIST_PAGE_SIZE = int(os.getenv('WISHLIST_PAGE_SIZE', 50))
+    WISHLIST_MAX_PAGE_SIZE = int(os.getenv('WISHLIST_MAX_PAGE_SIZE', 200))
+    WISHLIST_EXPORT_BATCH_SIZE = int(os.getenv('WISHLIST_EXPORT_BATCH_SIZE', 500))
+    WISHLIST_BULK_MAX_ITEMS = int(os.getenv('WISHLIST_BULK_MAX_ITEMS', 1000))
+    WISHLIST_BULK_CHUNK_SIZE = int(os.getenv('WISHLIST_BULK_CHUNK_SIZE', 200))
+    GAMES_BATCH_MAX_IDS = int(os.getenv('GAMES_BATCH_MAX_IDS', 50))
@@ -0,0 +1,153 @@
+"""baseline schema
+
+The tables as db.create_all() created them before migrations were added.
+Every table is only created if it is missing, so existing databases can be
+upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 18:23:53.485937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('catalog_games'):
+        op.create_table('catalog_games',
+            sa.Column('rawg_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('slug', sa.String(length=255), nullable=True),
+            sa.Column('rating', sa.Float(), nullable=True),
+            sa.Column('released', sa.Date(), nullable=True),
+            sa.Column('genres', sa.JSON(), nullable=True),
+            sa.Column('platforms', sa.JSON(), nullable=True),
+            sa.Column('background_image', sa.String(length=500), nullable=True),
+            sa.Column('updated', sa.DateTime(), nullable=True),
+            sa.Column('synced_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('rawg_id')
+        )
+        op.create_index(op.f('ix_catalog_games_name'), 'catalog_games', ['name'], unique=False)
+        op.create_index(op.f('ix_catalog_games_rating'), 'catalog_games', ['rating'], unique=False)
+        op.create_index(op.f('ix_catalog_games_released'), 'catalog_games', ['released'], unique=False)
+        op.create_index(op.f('ix_catalog_games_slug'), 'catalog_games', ['slug'], unique=False)
+        op.create_index(op.f('ix_catalog_games_updated'), 'catalog_games', ['updated'], unique=False)
+    
+    if not _has_table('catalog_sync_state'):
+        op.create_table('catalog_sync_state',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('synced_until', sa.Date(), nullable=True),
+            sa.Column('window_start', sa.Date(), nullable=True),
+            sa.Column('window_end', sa.Date(), nullable=True),
+            sa.Column('next_page', sa.Integer(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('name')
+        )
+    
+    if not _has_table('game_similarities'):
+        op.create_table('game_similarities',
+            sa.Column('rawg_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('similar_rawg_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('score', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('rawg_id', 'similar_rawg_id')
+        )
+    
+    if not _has_table('job_checkpoints'):
+        op.create_table('job_checkpoints',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('checkpoint', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+    
+    if not _has_table('users'):
+        op.create_table('users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('hashed_password', sa.String(length=255), nullable=False),
+            sa.Column('favorite_genres', sa.JSON(), nullable=True),
+            sa.Column('favorite_platforms', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+    
+    if not _has_table('catalog_game_genres'):
+        op.create_table('catalog_game_genres',
+            sa.Column('genre_slug', sa.String(length=80), nullable=False),
+            sa.Column('rawg_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['rawg_id'], ['catalog_games.rawg_id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('genre_slug', 'rawg_id')
+        )
+        op.create_index(op.f('ix_catalog_game_genres_rawg_id'), 'catalog_game_genres', ['rawg_id'], unique=False)
+    
+    if not _has_table('catalog_game_platforms'):
+        op.create_table('catalog_game_platforms',
+            sa.Column('platform_id', sa.Integer(), nullable=False),
+            sa.Column('rawg_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['rawg_id'], ['catalog_games.rawg_id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('platform_id', 'rawg_id')
+        )
+        op.create_index(op.f('ix_catalog_game_platforms_rawg_id'), 'catalog_game_platforms', ['rawg_id'], unique=False)
+    
+    if not _has_table('collection_versions'):
+        op.create_table('collection_versions',
+            sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+    
+    if not _has_table('games'):
+        op.create_table('games',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('rawg_id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=255), nullable=False),
+            sa.Column('cover_image', sa.String(length=500), nullable=True),
+            sa.Column('rating', sa.Float(), nullable=True),
+            sa.Column('release_date', sa.String(length=50), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('added_at', sa.DateTime(), nullable=True),
+            sa.Column('genres', sa.JSON(), nullable=True),
+            sa.Column('platforms', sa.JSON(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+    
+    if not _has_table('precomputed_recommendations'):
+        op.create_table('precomputed_recommendations',
+            sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('fingerprint', sa.String(length=40), nullable=False),
+            sa.Column('feeds', sa.JSON(), nullable=False),
+            sa.Column('generated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+
+def downgrade():
+    op.drop_table('precomputed_recommendations')
+    op.drop_table('games')
+    op.drop_table('collection_versions')
+    op.drop_table('catalog_game_platforms')
+    op.drop_table('catalog_game_genres')
+    op.drop_table('users')
+    op.drop_table('job_checkpoints')
+    op.drop_table('game_similarities')
+    op.drop_table('catalog_sync_state')
+    op.drop_table('catalog_games')
@@ -0,0 +1,70 @@
+"""games indexes and unique (user_id, rawg_id)
+
+Removes duplicate saves of the same game by one user, keeping the most
+recent row, then adds the unique constraint and the indexes the wishlist
+and game routes filter and sort on. On PostgreSQL the indexes are built
+CONCURRENTLY so the table stays writable while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 18:40:12.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_games_user_status': ['user_id', 'status'],
+    'ix_games_user_added_at': ['user_id', 'added_at']
+}
+
+
+def _existing(inspector):
+    names = {index['name'] for index in inspector.get_indexes('games')}
+    names.update(constraint['name'] for constraint in inspector.get_unique_constraints('games'))
+    return names
+
+
+def upgrade():
+    bind = op.get_bind()
+    existing = _existing(sa.inspect(bind))
+    
+    op.execute(
+        'DELETE FROM games WHERE id NOT IN ('
+        'SELECT MAX(id) FROM games GROUP BY user_id, rawg_id)'
+    )
+    
+    if bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            if 'uq_games_user_rawg' not in existing:
+                op.create_index('uq_games_user_rawg', 'games', ['user_id', 'rawg_id'],
+                                unique=True, postgresql_concurrently=True)
+                op.execute(
+                    'ALTER TABLE games ADD CONSTRAINT uq_games_user_rawg '
+                    'UNIQUE USING INDEX uq_games_user_rawg'
+                )
+            for name, columns in INDEXES.items():
+                if name not in existing:
+                    op.create_index(name, 'games', columns, postgresql_concurrently=True)
+        return
+    
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        if 'uq_games_user_rawg' not in existing:
+            batch_op.create_unique_constraint('uq_games_user_rawg', ['user_id', 'rawg_id'])
+        for name, columns in INDEXES.items():
+            if name not in existing:
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        for name in INDEXES:
+            batch_op.drop_index(name)
+        batch_op.drop_constraint('uq_games_user_rawg', type_='unique')
@@ -0,0 +1,47 @@
+"""wishlist sort indexes
+
+Adds a (user_id, <sort column>) index per wishlist sort key and widens
+(user_id, status) to (user_id, status, added_at), which still serves plain
+status filters. Superseded by the (..., id) indexes of 0005.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 19:05:41.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_games_user_status_added_at': ['user_id', 'status', 'added_at'],
+    'ix_games_user_rating': ['user_id', 'rating'],
+    'ix_games_user_release_date': ['user_id', 'release_date'],
+    'ix_games_user_title': ['user_id', 'title']
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES.items():
+                op.create_index(name, 'games', columns, postgresql_concurrently=True)
+            op.drop_index('ix_games_user_status', table_name='games', postgresql_concurrently=True)
+        return
+    
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        for name, columns in INDEXES.items():
+            batch_op.create_index(name, columns, unique=False)
+        batch_op.drop_index('ix_games_user_status')
+
+
+def downgrade():
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        batch_op.create_index('ix_games_user_status', ['user_id', 'status'], unique=False)
+        for name in INDEXES:
+            batch_op.drop_index(name)
@@ -0,0 +1,33 @@
+"""games rawg_id index
+
+Indexes games by rawg_id alone for lookups across all users' collections,
+such as the collaborative recommendation feed's game details.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 20:12:08.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_games_rawg_id', 'games', ['rawg_id'], postgresql_concurrently=True)
+        return
+    
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        batch_op.create_index('ix_games_rawg_id', ['rawg_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        batch_op.drop_index('ix_games_rawg_id')
@@ -0,0 +1,59 @@
+"""wishlist keyset indexes
+
+Replaces the (user_id[, status], <sort column>) indexes with ones that end
+in id, for every sort key with and without the status filter, so a keyset
+page seeks to its (<sort column>, id) cursor and reads only its own rows.
+Descending sorts are served by scanning these backwards.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 21:03:26.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+SORT_COLUMNS = ('added_at', 'rating', 'release_date', 'title')
+
+INDEXES = {
+    **{f'ix_games_user_{column}_id': ['user_id', column, 'id'] for column in SORT_COLUMNS},
+    **{f'ix_games_user_status_{column}_id': ['user_id', 'status', column, 'id'] for column in SORT_COLUMNS}
+}
+
+REPLACED = {
+    'ix_games_user_added_at': ['user_id', 'added_at'],
+    'ix_games_user_status_added_at': ['user_id', 'status', 'added_at'],
+    'ix_games_user_rating': ['user_id', 'rating'],
+    'ix_games_user_release_date': ['user_id', 'release_date'],
+    'ix_games_user_title': ['user_id', 'title']
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES.items():
+                op.create_index(name, 'games', columns, postgresql_concurrently=True)
+            for name in REPLACED:
+                op.drop_index(name, table_name='games', postgresql_concurrently=True)
+        return
+    
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        for name, columns in INDEXES.items():
+            batch_op.create_index(name, columns, unique=False)
+        for name in REPLACED:
+            batch_op.drop_index(name)
+
+
+def downgrade():
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        for name, columns in REPLACED.items():
+            batch_op.create_index(name, columns, unique=False)
+        for name in INDEXES:
+            batch_op.drop_index(name)
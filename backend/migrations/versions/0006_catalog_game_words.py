@@ -0,0 +1,64 @@
+"""catalog game words
+
+Adds catalog_game_words, one row per case-folded word of each catalog game
+name, so text search is an index lookup instead of a scan of catalog_games
+with ILIKE '%term%', and fills it from the games already mirrored. On
+PostgreSQL the word column uses the C collation so prefix matches are
+plain byte-order index ranges.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 21:40:52.000000
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+WORD_PATTERN = re.compile(r'\w+')
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    words = op.create_table('catalog_game_words',
+        sa.Column('word', sa.String(length=64).with_variant(postgresql.VARCHAR(64, collation='C'), 'postgresql'),
+                  nullable=False),
+        sa.Column('rawg_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['rawg_id'], ['catalog_games.rawg_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('word', 'rawg_id')
+    )
+    op.create_index(op.f('ix_catalog_game_words_rawg_id'), 'catalog_game_words', ['rawg_id'], unique=False)
+    
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        query = 'SELECT rawg_id, name FROM catalog_games'
+        if last_id is not None:
+            query += ' WHERE rawg_id > :last_id'
+        games = bind.execute(
+            sa.text(query + ' ORDER BY rawg_id LIMIT :limit'), {'last_id': last_id, 'limit': BATCH_SIZE}
+        ).all()
+        if not games:
+            break
+        
+        rows = [
+            {'word': word, 'rawg_id': rawg_id}
+            for rawg_id, name in games
+            for word in {w[:64] for w in WORD_PATTERN.findall((name or '').casefold())}
+        ]
+        if rows:
+            op.bulk_insert(words, rows)
+        last_id = games[-1][0]
+
+
+def downgrade():
+    op.drop_index(op.f('ix_catalog_game_words_rawg_id'), table_name='catalog_game_words')
+    op.drop_table('catalog_game_words')
@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql
 from datetime import datetime
-import bcrypt
+from services.password_service import PasswordService
 
 db = SQLAlchemy()
 
@@ -18,10 +19,13 @@ class User(db.Model):
     games = db.relationship('Game', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.hashed_password = PasswordService.hash(password)
     
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.hashed_password.encode('utf-8'))
+        return PasswordService.check(password, self.hashed_password)
+    
+    def password_needs_rehash(self):
+        return PasswordService.needs_rehash(self.hashed_password)
     
     def to_dict(self):
         return {
@@ -36,6 +40,22 @@ class User(db.Model):
 
 class Game(db.Model):
     __tablename__ = 'games'
+    __table_args__ = (
+        # Also serves lookups by (user_id, rawg_id) and by user_id alone
+        db.UniqueConstraint('user_id', 'rawg_id', name='uq_games_user_rawg'),
+        # Wishlist keyset pages: (<sort column>, id) per sort key, with and
+        # without the status filter; DESC sorts scan these backwards
+        db.Index('ix_games_user_added_at_id', 'user_id', 'added_at', 'id'),
+        db.Index('ix_games_user_rating_id', 'user_id', 'rating', 'id'),
+        db.Index('ix_games_user_release_date_id', 'user_id', 'release_date', 'id'),
+        db.Index('ix_games_user_title_id', 'user_id', 'title', 'id'),
+        db.Index('ix_games_user_status_added_at_id', 'user_id', 'status', 'added_at', 'id'),
+        db.Index('ix_games_user_status_rating_id', 'user_id', 'status', 'rating', 'id'),
+        db.Index('ix_games_user_status_release_date_id', 'user_id', 'status', 'release_date', 'id'),
+        db.Index('ix_games_user_status_title_id', 'user_id', 'status', 'title', 'id'),
+        # Lookups across every user's collection by RAWG id
+        db.Index('ix_games_rawg_id', 'rawg_id')
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -63,3 +83,125 @@ class Game(db.Model):
             'genres': self.genres or [],
             'platforms': self.platforms or []
         }
+
+
+class CollectionVersion(db.Model):
+    """Per-user version of the saved-games collection, bumped on every change"""
+    __tablename__ = 'collection_versions'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def current(user_id):
+        """Get the user's collection version (0 if it has never changed)"""
+        version = db.session.query(CollectionVersion.version).filter_by(user_id=user_id).scalar()
+        return version or 0
+    
+    @staticmethod
+    def bump(user_id):
+        """Increment the user's collection version as part of the current transaction"""
+        # Imported here because services.upsert imports db from this module
+        from services.upsert import bulk_upsert
+        
+        # One atomic upsert, so concurrent first changes cannot both insert
+        bulk_upsert(
+            CollectionVersion,
+            [{'user_id': user_id, 'version': 1, 'updated_at': datetime.utcnow()}],
+            ['user_id'],
+            update_columns=['updated_at'],
+            update_values={'version': CollectionVersion.version + 1}
+        )
+
+
+class PrecomputedRecommendation(db.Model):
+    """First page of a user's recommendation feeds, computed offline"""
+    __tablename__ = 'precomputed_recommendations'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    fingerprint = db.Column(db.String(40), nullable=False)
+    feeds = db.Column(db.JSON, nullable=False)
+    generated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class GameSimilarity(db.Model):
+    """Top co-saved games for a RAWG id, from the item-item collaborative filter"""
+    __tablename__ = 'game_similarities'
+    
+    rawg_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    similar_rawg_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    score = db.Column(db.Float, nullable=False)
+
+
+class JobCheckpoint(db.Model):
+    """Time up to which an incremental batch job has processed its inputs"""
+    __tablename__ = 'job_checkpoints'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    checkpoint = db.Column(db.DateTime, nullable=False)
+
+
+catalog_game_genres = db.Table(
+    'catalog_game_genres',
+    db.Column('genre_slug', db.String(80), primary_key=True),
+    db.Column('rawg_id', db.Integer, db.ForeignKey('catalog_games.rawg_id', ondelete='CASCADE'),
+              primary_key=True, index=True)
+)
+
+catalog_game_platforms = db.Table(
+    'catalog_game_platforms',
+    db.Column('platform_id', db.Integer, primary_key=True),
+    db.Column('rawg_id', db.Integer, db.ForeignKey('catalog_games.rawg_id', ondelete='CASCADE'),
+              primary_key=True, index=True)
+)
+
+catalog_game_words = db.Table(
+    'catalog_game_words',
+    # Byte order on PostgreSQL too, so prefix searches are plain index ranges as on SQLite
+    db.Column('word', db.String(64).with_variant(postgresql.VARCHAR(64, collation='C'), 'postgresql'),
+              primary_key=True),
+    db.Column('rawg_id', db.Integer, db.ForeignKey('catalog_games.rawg_id', ondelete='CASCADE'),
+              primary_key=True, index=True)
+)
+
+
+class CatalogGame(db.Model):
+    """Local mirror of a RAWG game, used to answer searches without calling RAWG"""
+    __tablename__ = 'catalog_games'
+    
+    rawg_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(255), nullable=False, index=True)
+    slug = db.Column(db.String(255), index=True)
+    rating = db.Column(db.Float, index=True)
+    released = db.Column(db.Date, index=True)
+    genres = db.Column(db.JSON, default=list)
+    platforms = db.Column(db.JSON, default=list)
+    background_image = db.Column(db.String(500))
+    updated = db.Column(db.DateTime, index=True)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.rawg_id,
+            'name': self.name,
+            'slug': self.slug,
+            'rating': self.rating,
+            'released': self.released.isoformat() if self.released else None,
+            'background_image': self.background_image,
+            'genres': self.genres or [],
+            'platforms': self.platforms or [],
+            'updated': self.updated.isoformat() if self.updated else None
+        }
+
+
+class CatalogSyncState(db.Model):
+    """Checkpoint for the incremental RAWG catalog sync"""
+    __tablename__ = 'catalog_sync_state'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    synced_until = db.Column(db.Date)
+    window_start = db.Column(db.Date)
+    window_end = db.Column(db.Date)
+    next_page = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
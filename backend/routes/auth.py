@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models import db, User
+from services.events import preferences_changed
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -49,6 +50,11 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({'error': 'Invalid username or password'}), 401
     
+    # Upgrade hashes made at an older cost while we have the plain password
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+        db.session.commit()
+    
     access_token = create_access_token(identity=str(user.id))
     
     return jsonify({
@@ -87,6 +93,7 @@ def update_preferences():
         user.favorite_platforms = data['favorite_platforms']
     
     db.session.commit()
+    preferences_changed.send(current_app._get_current_object(), user_id=user_id)
     
     return jsonify({
         'message': 'Preferences updated successfully',
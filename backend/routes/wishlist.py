@@ -1,18 +1,144 @@
-from flask import Blueprint, request, jsonify
+import csv
+import hashlib
+import io
+import json
+from flask import Blueprint, request, jsonify, make_response, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Game, User
+from sqlalchemy.exc import IntegrityError
+from models import db, CollectionVersion, Game, User
+from services.events import collection_changed
+from services.wishlist_service import WishlistService
 
 wishlist_bp = Blueprint('wishlist', __name__, url_prefix='/api/wishlist')
 
+EXPORT_FIELDS = (
+    'rawg_id', 'title', 'status', 'rating', 'release_date', 'added_at', 'genres', 'platforms', 'cover_image'
+)
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def find_saved_game(user_id, rawg_id):
+    return Game.query.filter_by(user_id=user_id, rawg_id=rawg_id).first()
+
+def update_saved_status(user_id, game, new_status):
+    game.status = new_status
+    CollectionVersion.bump(user_id)
+    db.session.commit()
+    collection_changed.send(current_app._get_current_object(), user_id=user_id, rawg_id=game.rawg_id,
+                            status=new_status)
+    return jsonify({
+        'message': f'Game status updated to {new_status}',
+        'game': game.to_dict()
+    }), 200
+
 @wishlist_bp.route('', methods=['GET'])
 @jwt_required()
 def get_wishlist():
     user_id = int(get_jwt_identity())
-    games = Game.query.filter_by(user_id=user_id).order_by(Game.added_at.desc()).all()
+    status = request.args.get('status') or None
+    sort = request.args.get('sort', 'added_at')
+    cursor = request.args.get('cursor') or None
+    limit = request.args.get('limit', type=int)
     
-    return jsonify({
-        'games': [game.to_dict() for game in games]
-    }), 200
+    try:
+        WishlistService.validate(status, sort)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Without limit or cursor the whole collection is returned, as before
+    paginated = limit is not None or cursor is not None
+    if paginated:
+        limit = min(max(limit or current_app.config['WISHLIST_PAGE_SIZE'], 1),
+                    current_app.config['WISHLIST_MAX_PAGE_SIZE'])
+    
+    query_key = hashlib.sha1(
+        json.dumps([status, sort, limit, cursor]).encode()
+    ).hexdigest()[:12]
+    etag = f'wishlist-{user_id}-{CollectionVersion.current(user_id)}-{query_key}'
+    
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    elif paginated:
+        try:
+            games, next_cursor = WishlistService.page(user_id, limit, status, sort, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        response = make_response(jsonify({
+            'games': [game.to_dict() for game in games],
+            'next_cursor': next_cursor
+        }), 200)
+    else:
+        games = WishlistService.query(user_id, status, sort).all()
+        response = make_response(jsonify({
+            'games': [game.to_dict() for game in games]
+        }), 200)
+    
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@wishlist_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_wishlist():
+    user_id = int(get_jwt_identity())
+    export_format = request.args.get('format', 'ndjson')
+    status = request.args.get('status') or None
+    sort = request.args.get('sort', 'added_at')
+    
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({'error': f"Invalid format. Must be one of: {', '.join(EXPORT_MIMETYPES)}"}), 400
+    
+    try:
+        WishlistService.validate(status, sort)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Rows are fetched in batches from a server-side cursor and written out as they arrive
+    games = WishlistService.query(user_id, status, sort).yield_per(
+        current_app.config['WISHLIST_EXPORT_BATCH_SIZE']
+    )
+    rows = (_export_row(game) for game in games)
+    
+    if export_format == 'csv':
+        body = _csv_lines(rows)
+    else:
+        body = (json.dumps(row) + '\n' for row in rows)
+    
+    response = current_app.response_class(stream_with_context(body), mimetype=EXPORT_MIMETYPES[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename=gamescout-collection.{export_format}'
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
+
+def _export_row(game):
+    row = game.to_dict()
+    return {field: row[field] for field in EXPORT_FIELDS}
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+    
+    yield line(EXPORT_FIELDS)
+    for row in rows:
+        row['genres'] = _csv_list(row['genres'])
+        row['platforms'] = _csv_list(row['platforms'])
+        yield line([row[field] for field in EXPORT_FIELDS])
+
+def _csv_list(value):
+    # Older rows were saved unvalidated; a bad value must not cut the stream short
+    if isinstance(value, (list, tuple)):
+        return '; '.join(map(str, value))
+    return '' if value is None else str(value)
 
 @wishlist_bp.route('', methods=['POST'])
 @jwt_required()
@@ -23,19 +149,10 @@ def add_to_wishlist():
     if not data or not all(k in data for k in ['rawg_id', 'title']):
         return jsonify({'error': 'Missing required fields (rawg_id, title)'}), 400
     
-    existing_game = Game.query.filter_by(
-        user_id=user_id,
-        rawg_id=data['rawg_id']
-    ).first()
+    existing_game = find_saved_game(user_id, data['rawg_id'])
     
     if existing_game:
-        new_status = data.get('status', 'wishlist')
-        existing_game.status = new_status
-        db.session.commit()
-        return jsonify({
-            'message': f'Game status updated to {new_status}',
-            'game': existing_game.to_dict()
-        }), 200
+        return update_saved_status(user_id, existing_game, data.get('status', 'wishlist'))
     
     game = Game(
         user_id=user_id,
@@ -49,8 +166,20 @@ def add_to_wishlist():
         platforms=data.get('platforms', [])
     )
     
-    db.session.add(game)
-    db.session.commit()
+    try:
+        db.session.add(game)
+        CollectionVersion.bump(user_id)
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request saved the same game first
+        db.session.rollback()
+        existing_game = find_saved_game(user_id, data['rawg_id'])
+        if existing_game is None:
+            raise
+        return update_saved_status(user_id, existing_game, data.get('status', 'wishlist'))
+    
+    collection_changed.send(current_app._get_current_object(), user_id=user_id, rawg_id=game.rawg_id,
+                            status=game.status)
     
     return jsonify({
         'message': 'Game added to wishlist',
@@ -58,6 +187,31 @@ def add_to_wishlist():
     }), 201
 
 
+@wishlist_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_add_to_wishlist():
+    user_id = int(get_jwt_identity())
+    data = request.get_json(silent=True)
+    items = data.get('games') if isinstance(data, dict) else data
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Expected a non-empty list of games'}), 400
+    
+    max_items = current_app.config['WISHLIST_BULK_MAX_ITEMS']
+    if len(items) > max_items:
+        return jsonify({'error': f'Too many games (maximum is {max_items})'}), 400
+    
+    results = WishlistService.save_many(user_id, items)
+    db.session.commit()
+    
+    if any(result['result'] in ('created', 'updated') for result in results):
+        collection_changed.send(current_app._get_current_object(), user_id=user_id, rawg_id=None)
+    
+    counts = {outcome: sum(r['result'] == outcome for r in results)
+              for outcome in ('created', 'updated', 'duplicate', 'error')}
+    return jsonify({'results': results, **counts}), 200
+
+
 @wishlist_bp.route('/<int:game_id>', methods=['GET'])
 @jwt_required()
 def get_wishlist_game(game_id):
@@ -84,9 +238,14 @@ def update_wishlist_game(game_id):
         if data['status'] not in ['wishlist', 'played', 'interested']:
             return jsonify({'error': 'Invalid status. Must be: wishlist, played, or interested'}), 400
         game.status = data['status']
+        CollectionVersion.bump(user_id)
     
     db.session.commit()
     
+    if 'status' in data:
+        collection_changed.send(current_app._get_current_object(), user_id=user_id, rawg_id=game.rawg_id,
+                                status=game.status)
+    
     return jsonify({
         'message': 'Game updated successfully',
         'game': game.to_dict()
@@ -103,7 +262,10 @@ def delete_wishlist_game(game_id):
         return jsonify({'error': 'Game not found in wishlist'}), 404
     
     db.session.delete(game)
+    CollectionVersion.bump(user_id)
     db.session.commit()
+    collection_changed.send(current_app._get_current_object(), user_id=user_id, rawg_id=game.rawg_id,
+                            status=None)
     
     return jsonify({'message': 'Game removed from wishlist'}), 200
 
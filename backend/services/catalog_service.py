@@ -0,0 +1,239 @@
+import re
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import and_, func, select
+from models import (
+    db, CatalogGame, CatalogSyncState, catalog_game_genres, catalog_game_platforms, catalog_game_words
+)
+from services.upsert import bulk_upsert
+
+SYNC_STATE_NAME = 'rawg_games'
+
+WORD_PATTERN = re.compile(r'\w+')
+MAX_WORD_LENGTH = 64
+# Sorts after every character, so [word, word + PREFIX_END) holds every word starting with word
+PREFIX_END = '\U0010ffff'
+
+
+def _name_words(name):
+    """Case-folded words of a game name, as stored in catalog_game_words"""
+    return {word[:MAX_WORD_LENGTH] for word in WORD_PATTERN.findall((name or '').casefold())}
+
+
+def _search_terms(search):
+    """
+    Split a search into (word, is_prefix) terms
+    
+    Every word must match a word of the name exactly, except a last word
+    the user may still be typing (one not followed by punctuation or a
+    space), which matches as a prefix.
+    """
+    folded = search.casefold()
+    words = [word[:MAX_WORD_LENGTH] for word in WORD_PATTERN.findall(folded)]
+    typing = bool(words) and WORD_PATTERN.fullmatch(folded[-1]) is not None
+    return [(word, typing and i == len(words) - 1) for i, word in enumerate(words)]
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def _parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None) if value else None
+    except ValueError:
+        return None
+
+
+class CatalogService:
+    """Service for the local mirror of the RAWG game catalog"""
+    
+    @staticmethod
+    def _to_row(game):
+        """Convert a RAWG game payload into a catalog_games row"""
+        return {
+            'rawg_id': game['id'],
+            'name': (game.get('name') or '')[:255],
+            'slug': game.get('slug'),
+            'rating': game.get('rating'),
+            'released': _parse_date(game.get('released')),
+            'genres': [
+                {'id': g.get('id'), 'name': g.get('name'), 'slug': g.get('slug')}
+                for g in game.get('genres') or []
+            ],
+            'platforms': [
+                {'platform': {
+                    'id': p['platform'].get('id'),
+                    'name': p['platform'].get('name'),
+                    'slug': p['platform'].get('slug')
+                }}
+                for p in game.get('platforms') or [] if p.get('platform')
+            ],
+            'background_image': game.get('background_image'),
+            'updated': _parse_datetime(game.get('updated')),
+            'synced_at': datetime.utcnow()
+        }
+    
+    @staticmethod
+    def upsert_games(games):
+        """Bulk upsert RAWG game payloads and their genre/platform index rows"""
+        rows = [CatalogService._to_row(game) for game in games if game.get('id')]
+        if not rows:
+            return 0
+        
+        bulk_upsert(CatalogGame, rows, ['rawg_id'])
+        
+        rawg_ids = [row['rawg_id'] for row in rows]
+        db.session.execute(catalog_game_genres.delete().where(catalog_game_genres.c.rawg_id.in_(rawg_ids)))
+        db.session.execute(catalog_game_platforms.delete().where(catalog_game_platforms.c.rawg_id.in_(rawg_ids)))
+        db.session.execute(catalog_game_words.delete().where(catalog_game_words.c.rawg_id.in_(rawg_ids)))
+        
+        genre_rows = {
+            (g['slug'], row['rawg_id'])
+            for row in rows for g in row['genres'] if g.get('slug')
+        }
+        platform_rows = {
+            (p['platform']['id'], row['rawg_id'])
+            for row in rows for p in row['platforms'] if p['platform'].get('id') is not None
+        }
+        if genre_rows:
+            db.session.execute(catalog_game_genres.insert(), [
+                {'genre_slug': slug, 'rawg_id': rawg_id} for slug, rawg_id in genre_rows
+            ])
+        word_rows = [
+            {'word': word, 'rawg_id': row['rawg_id']}
+            for row in rows for word in _name_words(row['name'])
+        ]
+        if platform_rows:
+            db.session.execute(catalog_game_platforms.insert(), [
+                {'platform_id': platform_id, 'rawg_id': rawg_id} for platform_id, rawg_id in platform_rows
+            ])
+        if word_rows:
+            db.session.execute(catalog_game_words.insert(), word_rows)
+        return len(rows)
+    
+    @staticmethod
+    def sync(fetch_games, max_pages=None, full=False):
+        """
+        Incrementally mirror RAWG games updated since the last completed sync
+        
+        Pages through RAWG ordered by `updated` within a fixed window, committing
+        the upserted games together with a checkpoint after every page so an
+        interrupted run resumes from the page it stopped on.
+        
+        Args:
+            fetch_games: Callable taking RAWG /games query params and returning
+                the decoded page
+            max_pages: Stop after this many pages (the run resumes next time)
+            full: Ignore the previous high-water mark and resync everything
+        
+        Returns:
+            Dict with the number of pages and games synced and whether the
+            run completed
+        """
+        state = db.session.get(CatalogSyncState, SYNC_STATE_NAME)
+        if state is None:
+            state = CatalogSyncState(name=SYNC_STATE_NAME)
+            db.session.add(state)
+        
+        if full:
+            state.synced_until = None
+            state.next_page = None
+        
+        if state.next_page is None:
+            state.window_start = state.synced_until
+            state.window_end = date.today()
+            state.next_page = 1
+            db.session.commit()
+        
+        page_size = current_app.config['CATALOG_SYNC_PAGE_SIZE']
+        pages = 0
+        games = 0
+        
+        while max_pages is None or pages < max_pages:
+            params = {
+                'ordering': 'updated',
+                'page': state.next_page,
+                'page_size': page_size
+            }
+            if state.window_start:
+                params['updated'] = f'{state.window_start.isoformat()},{state.window_end.isoformat()}'
+            
+            data = fetch_games(params)
+            games += CatalogService.upsert_games(data.get('results', []))
+            pages += 1
+            
+            if data.get('next'):
+                state.next_page += 1
+            else:
+                state.synced_until = state.window_end
+                state.next_page = None
+            db.session.commit()
+            
+            if state.next_page is None:
+                break
+        
+        return {'pages': pages, 'games': games, 'complete': state.next_page is None}
+    
+    @staticmethod
+    def search(page=1, page_size=20, genres=None, platforms=None, search=None, released_between=None):
+        """
+        Answer a search_games query from the local catalog
+        
+        Arguments are the normalized search_games parameters; the result has the
+        same shape as a RAWG /games page, with `next` holding the next page
+        number (or None on the last page). Text search matches whole words of
+        the name through the catalog_game_words index (see _search_terms),
+        and `count` stops at CATALOG_SEARCH_COUNT_LIMIT.
+        """
+        query = CatalogGame.query
+        
+        for word, is_prefix in _search_terms(search or ''):
+            words = catalog_game_words.c.word
+            matches = and_(words >= word, words < word + PREFIX_END) if is_prefix else words == word
+            query = query.filter(CatalogGame.rawg_id.in_(
+                select(catalog_game_words.c.rawg_id).where(matches)
+            ))
+        
+        if genres:
+            query = query.filter(CatalogGame.rawg_id.in_(
+                select(catalog_game_genres.c.rawg_id)
+                .where(catalog_game_genres.c.genre_slug.in_(genres.split(',')))
+            ))
+        
+        if platforms:
+            platform_ids = [int(p) for p in platforms.split(',') if p.isdigit()]
+            query = query.filter(CatalogGame.rawg_id.in_(
+                select(catalog_game_platforms.c.rawg_id)
+                .where(catalog_game_platforms.c.platform_id.in_(platform_ids))
+            ))
+        
+        if released_between:
+            query = query.filter(CatalogGame.released.between(*released_between))
+        
+        offset = (page - 1) * page_size
+        games = (
+            query.order_by(CatalogGame.released.desc(), CatalogGame.rawg_id.desc())
+            .offset(offset)
+            .limit(page_size + 1)
+            .all()
+        )
+        has_next = len(games) > page_size
+        games = games[:page_size]
+        
+        if not has_next and (games or page == 1):
+            count = offset + len(games)
+        else:
+            # Count only up to the limit instead of the whole match set
+            capped = query.with_entities(CatalogGame.rawg_id).limit(current_app.config['CATALOG_SEARCH_COUNT_LIMIT'])
+            count = db.session.scalar(select(func.count()).select_from(capped.subquery()))
+        
+        return {
+            'count': count,
+            'next': page + 1 if has_next else None,
+            'previous': page - 1 if page > 1 else None,
+            'results': [game.to_dict() for game in games]
+        }
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import deque
+import requests
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a dependency while its circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker
+    
+    Tracks the outcome of the last `window_size` calls. Once at least
+    `min_calls` have been recorded and the failure rate reaches
+    `failure_rate`, the circuit opens and calls fail fast for `reset_timeout`
+    seconds. It then half-opens and lets a single trial call through: success
+    closes the circuit, failure opens it again.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, window_size=20, failure_rate=0.5, min_calls=10, reset_timeout=30):
+        self.window_size = window_size
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._rejected = 0
+    
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+    
+    def _before_call(self):
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._rejected += 1
+                    raise CircuitOpenError('RAWG API unavailable (circuit open)')
+                self._state = self.HALF_OPEN
+            
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self._rejected += 1
+                    raise CircuitOpenError('RAWG API unavailable (circuit half-open)')
+                self._trial_in_flight = True
+    
+    def _record(self, success):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+                if success:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._state = self.OPEN
+                    self._opened_at = time.monotonic()
+                return
+            
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+    
+    def call(self, fn, *args, is_failure=None, **kwargs):
+        """
+        Call fn through the breaker
+        
+        Exceptions count as failures unless is_failure(exception) returns
+        False (e.g. for 404s, which say nothing about the dependency's health).
+        """
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record(is_failure is not None and not is_failure(e))
+            raise
+        self._record(True)
+        return result
+    
+    def stats(self):
+        """Get the current state and recent outcome counts"""
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': self._outcomes.count(False),
+                'rejected': self._rejected
+            }
@@ -0,0 +1,53 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name, max_workers):
+    """Get a named, bounded per-process executor, rebuilding it after a fork"""
+    pid = os.getpid()
+    with _executors_lock:
+        executor, owner_pid = _executors.get(name, (None, None))
+        if executor is None or owner_pid != pid:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+            _executors[name] = (executor, pid)
+        return executor
+
+
+def submit_with_app_context(executor, fn, *args, **kwargs):
+    """Submit fn to the executor, running it inside the current app's context"""
+    app = current_app._get_current_object()
+    
+    def run():
+        with app.app_context():
+            return fn(*args, **kwargs)
+    
+    return executor.submit(run)
+
+
+def gather(futures, timeout):
+    """
+    Wait for named futures until the timeout expires
+    
+    Returns a (results, timed_out) pair: results maps each name to its value,
+    or None if it did not finish in time or raised, and timed_out lists the
+    names that were still running.
+    """
+    done, _ = wait(futures.values(), timeout=max(timeout, 0))
+    results = {}
+    timed_out = []
+    
+    for name, future in futures.items():
+        if future not in done:
+            timed_out.append(name)
+            results[name] = None
+        elif future.exception() is not None:
+            current_app.logger.error(f'Background task {name} failed: {future.exception()}')
+            results[name] = None
+        else:
+            results[name] = future.result()
+    return results, timed_out
@@ -0,0 +1,83 @@
+import re
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+
+class ContentFilter:
+    """
+    Compiled content filter for RAWG games
+    
+    All keywords are compiled into one case-insensitive regex that only
+    matches whole words, so 'ass' blocks "Ass Hunter" but not "Assassin's
+    Creed" or "Classic". Games are also blocked by RAWG tag slugs and ESRB
+    rating slugs. Only the keyword verdict is cached, per RAWG id and name
+    in a bounded LRU; tags and ESRB ratings are checked on every call since
+    not every payload for a game carries them.
+    """
+    
+    def __init__(self, keywords=(), tags=(), esrb_ratings=(), cache_size=10000):
+        keywords = sorted({k.strip().lower() for k in keywords if k.strip()}, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'(?<![^\W_])(?:' + '|'.join(map(re.escape, keywords)) + r')(?![^\W_])',
+            re.IGNORECASE
+        ) if keywords else None
+        self._tags = frozenset(t.strip().lower() for t in tags if t.strip())
+        self._esrb_ratings = frozenset(r.strip().lower() for r in esrb_ratings if r.strip())
+        
+        self._cache_size = cache_size
+        self._verdicts = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _name_blocked(self, name):
+        return self._pattern is not None and self._pattern.search(name) is not None
+    
+    def _metadata_blocked(self, game):
+        esrb = game.get('esrb_rating') or {}
+        if (esrb.get('slug') or '').lower() in self._esrb_ratings:
+            return True
+        
+        return any((tag.get('slug') or '').lower() in self._tags for tag in game.get('tags') or ())
+    
+    def _cached_name_blocked(self, rawg_id, name):
+        if rawg_id is None:
+            return self._name_blocked(name)
+        
+        key = (rawg_id, name)
+        with self._lock:
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self._verdicts.move_to_end(key)
+                return verdict
+        
+        verdict = self._name_blocked(name)
+        with self._lock:
+            self._verdicts[key] = verdict
+            if len(self._verdicts) > self._cache_size:
+                self._verdicts.popitem(last=False)
+        return verdict
+    
+    def is_blocked(self, game):
+        """Whether the game should be hidden from search and recommendations"""
+        return (
+            self._metadata_blocked(game)
+            or self._cached_name_blocked(game.get('id'), game.get('name') or '')
+        )
+    
+    def allowed(self, games):
+        """Filter a page of games in a single pass"""
+        return [game for game in games if not self.is_blocked(game)]
+
+
+def get_content_filter():
+    """Get the app's content filter, compiling it from config on first use"""
+    extensions = current_app.extensions
+    if 'content_filter' not in extensions:
+        config = current_app.config
+        extensions['content_filter'] = ContentFilter(
+            keywords=config['CONTENT_FILTER_KEYWORDS'],
+            tags=config['CONTENT_FILTER_TAGS'],
+            esrb_ratings=config['CONTENT_FILTER_ESRB_RATINGS'],
+            cache_size=config['CONTENT_FILTER_CACHE_SIZE']
+        )
+    return extensions['content_filter']
@@ -0,0 +1,12 @@
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Sent after a user's wishlist/played collection is committed.
+# Sender is the app; receivers get user_id, rawg_id and the game's new status
+# (None if it was removed). rawg_id is None for changes to many games at once.
+collection_changed = _signals.signal('collection-changed')
+
+# Sent after a user's favorite genres/platforms are committed.
+# Sender is the app; receivers get user_id.
+preferences_changed = _signals.signal('preferences-changed')
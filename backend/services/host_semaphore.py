@@ -0,0 +1,85 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class HostSemaphore:
+    """
+    Counting semaphore shared by every worker process on a host
+    
+    Each holder owns a row in a small SQLite file; acquiring counts the live
+    rows and adds one inside one IMMEDIATE transaction, so concurrent workers
+    are serialized by SQLite's file lock. Rows expire after lease_timeout
+    seconds, so a worker that dies while holding a slot cannot leak it.
+    """
+    
+    # How often a waiting caller checks for a free slot
+    POLL_INTERVAL = 0.05
+    
+    def __init__(self, path, limit, name, lease_timeout=30.0):
+        self.path = path
+        self.limit = limit
+        self.name = name
+        self.lease_timeout = lease_timeout
+        self._local = threading.local()
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS semaphore_leases '
+                '(name TEXT NOT NULL, lease TEXT NOT NULL, expires REAL NOT NULL, PRIMARY KEY (name, lease))'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def try_acquire(self):
+        """Take a slot if one is free, returning its lease id, or None if all are held"""
+        conn = self._connection()
+        now = time.time()
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM semaphore_leases WHERE name = ? AND expires <= ?', (self.name, now))
+            held = conn.execute(
+                'SELECT COUNT(*) FROM semaphore_leases WHERE name = ?', (self.name,)
+            ).fetchone()[0]
+            
+            lease = None
+            if held < self.limit:
+                lease = uuid.uuid4().hex
+                conn.execute(
+                    'INSERT INTO semaphore_leases (name, lease, expires) VALUES (?, ?, ?)',
+                    (self.name, lease, now + self.lease_timeout)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return lease
+    
+    def acquire(self, max_wait=0.0):
+        """Take a slot, waiting for up to max_wait seconds; returns its lease id, or None"""
+        deadline = time.monotonic() + max_wait
+        
+        while True:
+            lease = self.try_acquire()
+            if lease is not None:
+                return lease
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # Jitter so waiting workers do not poll in lockstep
+            time.sleep(min(remaining, self.POLL_INTERVAL * (1 + random.random())))
+    
+    def release(self, lease):
+        """Give back a slot taken by acquire()"""
+        self._connection().execute(
+            'DELETE FROM semaphore_leases WHERE name = ? AND lease = ?', (self.name, lease)
+        )
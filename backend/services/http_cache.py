@@ -0,0 +1,73 @@
+import gzip
+import hashlib
+from flask import Response, current_app, jsonify, request
+from services.rawg_service import cache
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def _serialize(data):
+    """Serialize data once into its identity and compressed representations"""
+    body = current_app.json.dumps(data).encode('utf-8')
+    entry = {
+        'etag': hashlib.sha256(body).hexdigest()[:32],
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=6)
+    }
+    if brotli:
+        entry['br'] = brotli.compress(body, quality=5)
+    return entry
+
+
+def _negotiate(entry):
+    for encoding in ENCODINGS:
+        if request.accept_encodings[encoding] and len(entry[encoding]) < len(entry['identity']):
+            return encoding
+    return 'identity'
+
+
+def _etag(entry, encoding):
+    # Each encoding is a different representation, so it gets its own strong ETag
+    return entry['etag'] if encoding == 'identity' else f"{entry['etag']}-{encoding}"
+
+
+def cached_json_response(cache_key, producer, max_age, private=False):
+    """
+    Serve JSON from cached, pre-serialized and pre-compressed bytes
+    
+    The serialized body and its gzip/brotli encodings are cached under
+    cache_key together with a strong ETag, so repeat requests skip
+    serialization and compression entirely; requests whose If-None-Match
+    matches get a 304. Error payloads from producer are returned uncached.
+    """
+    entry = cache.get(cache_key)
+    if entry is None:
+        data = producer()
+        if 'error' in data:
+            return jsonify(data), 200
+        entry = _serialize(data)
+        cache.set(cache_key, entry, timeout=current_app.config['RESPONSE_CACHE_TIMEOUT'])
+    
+    encoding = _negotiate(entry)
+    known_etags = [_etag(entry, e) for e in ('identity',) + ENCODINGS if e in entry]
+    
+    if any(request.if_none_match.contains(etag) for etag in known_etags):
+        response = Response(status=304)
+    else:
+        response = Response(entry[encoding], mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    
+    response.set_etag(_etag(entry, encoding))
+    response.vary.add('Accept-Encoding')
+    if private:
+        response.vary.add('Authorization')
+    response.cache_control.max_age = max_age
+    response.cache_control.public = not private
+    response.cache_control.private = private
+    return response
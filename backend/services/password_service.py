@@ -0,0 +1,68 @@
+import threading
+import bcrypt
+from flask import current_app
+from services.host_semaphore import HostSemaphore
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many hashes are already in flight and the request is shed"""
+
+
+def _get_semaphore(config):
+    """Get the host-wide semaphore bounding in-flight hashes"""
+    key = (config['PASSWORD_HASH_SLOTS_DB'], config['PASSWORD_HASH_MAX_PENDING'])
+    with _semaphores_lock:
+        if key not in _semaphores:
+            _semaphores[key] = HostSemaphore(
+                *key, name='password-hash', lease_timeout=config['PASSWORD_HASH_LEASE_TIMEOUT']
+            )
+        return _semaphores[key]
+
+
+class PasswordService:
+    """
+    bcrypt hashing under a host-wide concurrency limit
+    
+    Every worker process on the host takes a slot from one SQLite-backed
+    semaphore before hashing, so a burst of logins cannot run more than
+    PASSWORD_HASH_MAX_PENDING hashes at once whatever the worker model.
+    Requests that cannot get a slot within PASSWORD_HASH_QUEUE_TIMEOUT fail
+    with PasswordHashingBusy. Waiting holds the worker just as hashing does,
+    so the timeout defaults to 0 and overflow is shed at once; raising it
+    trades fewer 503s in short bursts for workers tied up in longer ones.
+    """
+    
+    @staticmethod
+    def _run(fn, *args):
+        config = current_app.config
+        semaphore = _get_semaphore(config)
+        
+        lease = semaphore.acquire(max_wait=config['PASSWORD_HASH_QUEUE_TIMEOUT'])
+        if lease is None:
+            raise PasswordHashingBusy('Too many password checks in progress')
+        try:
+            return fn(*args)
+        finally:
+            semaphore.release(lease)
+    
+    @staticmethod
+    def hash(password):
+        """Hash a password at the configured bcrypt cost"""
+        salt = bcrypt.gensalt(rounds=current_app.config['BCRYPT_ROUNDS'])
+        return PasswordService._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+    
+    @staticmethod
+    def check(password, hashed):
+        """Check a password against a stored hash"""
+        return PasswordService._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+    
+    @staticmethod
+    def needs_rehash(hashed):
+        """Whether a stored hash was made at a different cost than the configured one"""
+        try:
+            return int(hashed.split('$')[2]) != current_app.config['BCRYPT_ROUNDS']
+        except (IndexError, ValueError):
+            return True
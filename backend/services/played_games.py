@@ -0,0 +1,50 @@
+from array import array
+from bisect import bisect_left
+from flask import current_app
+from sqlalchemy import select
+from models import db, CollectionVersion, Game
+from services.rawg_service import cache
+
+
+class PlayedIds:
+    """A user's played RAWG ids as a sorted array of 64-bit ints"""
+    
+    __slots__ = ('ids',)
+    
+    def __init__(self, ids=(), presorted=False):
+        self.ids = ids if presorted else array('q', sorted(set(ids)))
+    
+    def __contains__(self, rawg_id):
+        i = bisect_left(self.ids, rawg_id)
+        return i < len(self.ids) and self.ids[i] == rawg_id
+    
+    def __len__(self):
+        return len(self.ids)
+
+
+class PlayedGamesService:
+    """
+    Cached per-user set of played games, used to hide them from search and recommendations
+    
+    Entries are keyed by the user's collection version, so any change to the
+    collection moves readers to a fresh key and a set loaded before the
+    change can never be served after it; old entries simply expire.
+    """
+    
+    @staticmethod
+    def _cache_key(user_id, version):
+        return f'played:{user_id}:{version}'
+    
+    @staticmethod
+    def get(user_id):
+        """Get the user's played ids, loading only the rawg_id column on a cache miss"""
+        key = PlayedGamesService._cache_key(user_id, CollectionVersion.current(user_id))
+        cached = cache.get(key)
+        if cached is not None:
+            return PlayedIds(cached, presorted=True)
+        
+        played = PlayedIds(db.session.scalars(
+            select(Game.rawg_id).where(Game.user_id == user_id, Game.status == 'played')
+        ))
+        cache.set(key, played.ids, timeout=current_app.config['PLAYED_IDS_CACHE_TIMEOUT'])
+        return played
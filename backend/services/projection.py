@@ -0,0 +1,77 @@
+# Nested RAWG objects are reduced to the keys we render
+NESTED_FIELDS = {
+    'genres': ('id', 'name', 'slug'),
+    'developers': ('id', 'name', 'slug'),
+    'publishers': ('id', 'name', 'slug'),
+    'esrb_rating': ('id', 'name', 'slug'),
+    # Only kept so the content filter can check them
+    'tags': ('slug',)
+}
+
+# Fields kept when RAWG payloads are cached; ?fields= may select any of these
+LIST_FIELDS = (
+    'id', 'name', 'slug', 'released', 'tba', 'background_image', 'rating',
+    'ratings_count', 'metacritic', 'genres', 'platforms', 'esrb_rating', 'tags'
+)
+DETAIL_FIELDS = LIST_FIELDS + (
+    'description_raw', 'website', 'playtime', 'developers', 'publishers'
+)
+
+# Fields returned when no ?fields= parameter is given
+DEFAULT_LIST_FIELDS = (
+    'id', 'name', 'slug', 'released', 'background_image', 'rating', 'genres', 'platforms'
+)
+DEFAULT_DETAIL_FIELDS = tuple(field for field in DETAIL_FIELDS if field != 'tags')
+
+PAGE_FIELDS = ('count', 'next', 'previous')
+
+
+def _slim_value(field, value):
+    if field == 'platforms' and isinstance(value, list):
+        return [
+            {'platform': {k: p['platform'].get(k) for k in ('id', 'name', 'slug')}}
+            for p in value if isinstance(p, dict) and p.get('platform')
+        ]
+    keys = NESTED_FIELDS.get(field)
+    if keys and isinstance(value, list):
+        return [{k: item.get(k) for k in keys} for item in value if isinstance(item, dict)]
+    if keys and isinstance(value, dict):
+        return {k: value.get(k) for k in keys}
+    return value
+
+
+def project_game(game, fields):
+    """Keep only the given fields of a RAWG game, slimming nested objects"""
+    return {field: _slim_value(field, game[field]) for field in fields if field in game}
+
+
+def project_page(page, fields=LIST_FIELDS):
+    """Slim a RAWG list page down to its pagination keys and projected results"""
+    projected = {key: page.get(key) for key in PAGE_FIELDS if key in page}
+    projected['results'] = [project_game(game, fields) for game in page.get('results', [])]
+    return projected
+
+
+def select_fields(game, fields):
+    """Pick already-projected fields of a game for a response"""
+    return {field: game[field] for field in fields if field in game}
+
+
+def parse_fields(value, allowed, default):
+    """
+    Parse a ?fields= parameter
+    
+    Returns the requested fields (or the default set when none are given),
+    or raises ValueError naming any field that is not allowed.
+    """
+    if not value:
+        return default
+    
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return tuple(fields)
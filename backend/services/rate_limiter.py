@@ -0,0 +1,140 @@
+import contextlib
+import contextvars
+import os
+import random
+import sqlite3
+import threading
+import time
+import requests
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_DEFAULT = 'default'
+PRIORITY_BULK = 'bulk'
+
+# Share of the burst each priority must leave in the bucket, so interactive
+# calls can always use the headroom that default and bulk work cannot touch
+PRIORITY_RESERVE = {
+    PRIORITY_INTERACTIVE: 0.0,
+    PRIORITY_DEFAULT: 0.25,
+    PRIORITY_BULK: 0.5
+}
+
+_priority_override = contextvars.ContextVar('rate_limit_priority', default=None)
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Raised when a call could not get a token before its deadline and was shed"""
+
+
+@contextlib.contextmanager
+def rate_priority(priority):
+    """Run the enclosed calls at the given priority, whatever they request"""
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+def effective_priority(priority):
+    """Get the priority to use for a call, honouring any rate_priority() override"""
+    return _priority_override.get() or priority
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every worker process on a host
+    
+    The bucket state lives in a small SQLite file; each acquisition refills
+    and takes a token inside one IMMEDIATE transaction, so concurrent workers
+    are serialized by SQLite's file lock and draw from one budget.
+    """
+    
+    def __init__(self, path, rate, burst, name='rawg'):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0, 'shed': 0}
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS token_buckets '
+                '(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def try_acquire(self, priority=PRIORITY_DEFAULT):
+        """
+        Take a token if this priority's reserve allows it
+        
+        Returns a (acquired, retry_after) pair, where retry_after is the number
+        of seconds until a token should be available for this priority.
+        """
+        floor = int(self.burst * PRIORITY_RESERVE[priority])
+        conn = self._connection()
+        now = time.time()
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated FROM token_buckets WHERE name = ?', (self.name,)
+            ).fetchone()
+            tokens = self.burst if row is None else min(
+                self.burst, row[0] + max(now - row[1], 0) * self.rate
+            )
+            
+            acquired = tokens - 1 >= floor
+            if acquired:
+                tokens -= 1
+            
+            conn.execute(
+                'INSERT OR REPLACE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                (self.name, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        
+        if acquired:
+            return True, 0.0
+        return False, (floor + 1 - tokens) / self.rate
+    
+    def acquire(self, priority=PRIORITY_DEFAULT, max_wait=0.0):
+        """
+        Take a token, queueing for up to max_wait seconds
+        
+        Raises RateLimitExceeded if no token is available in time.
+        """
+        deadline = time.monotonic() + max_wait
+        waited = False
+        
+        while True:
+            acquired, retry_after = self.try_acquire(priority)
+            if acquired:
+                with self._stats_lock:
+                    self._stats['acquired'] += 1
+                    self._stats['waited'] += waited
+                return
+            
+            remaining = deadline - time.monotonic()
+            if retry_after > remaining:
+                with self._stats_lock:
+                    self._stats['shed'] += 1
+                raise RateLimitExceeded(f'RAWG rate limit reached; {priority} request shed')
+            
+            waited = True
+            # Jitter so workers waiting on the same refill do not wake together
+            time.sleep(retry_after * (1 + random.random() * 0.1))
+    
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
@@ -1,13 +1,307 @@
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
 import requests
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 from flask import current_app
 from flask_caching import Cache
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util import Retry
+from services.catalog_service import CatalogService
+from services.circuit_breaker import CircuitBreaker
+from services.concurrency import get_executor, gather, submit_with_app_context
+from services.projection import DETAIL_FIELDS, project_game, project_page
+from services.rate_limiter import (
+    PRIORITY_BULK, PRIORITY_DEFAULT, PRIORITY_INTERACTIVE, TokenBucket,
+    effective_priority, rate_priority
+)
+from services.single_flight import SingleFlight
 
 cache = Cache()
+rawg_flight = SingleFlight()
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RELEASE_FILTERS = ('upcoming', 'current', 'both')
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+os.register_at_fork(after_in_child=_refreshing.clear)
+
+# Latest monotonic time a retry of the current RAWG call may start and still
+# finish within RAWG_CALL_TIMEOUT; set by RAWGService._fetch
+_retry_cutoff = contextvars.ContextVar('rawg_retry_cutoff', default=None)
+
+
+class BoundedRetry(Retry):
+    """
+    Retry policy that keeps every call within its time budget
+    
+    Retry-After is capped at backoff_max rather than slept in full, and a
+    retry is only made if, after its wait, a whole attempt still fits
+    before the call's cutoff; otherwise the last response or error is
+    returned as if retries had run out.
+    """
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.backoff_max)
+    
+    def _wait(self, response=None):
+        if self.respect_retry_after_header and response is not None:
+            retry_after = self.get_retry_after(response)
+            if retry_after:
+                return retry_after
+        return self.get_backoff_time()
+    
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        
+        cutoff = _retry_cutoff.get()
+        if cutoff is not None and time.monotonic() + new_retry._wait(response) > cutoff:
+            if response is not None and response.status:
+                cause = ResponseError.SPECIFIC_ERROR.format(status_code=response.status)
+            else:
+                cause = ResponseError.GENERIC_ERROR
+            reason = error or ResponseError(cause)
+            raise MaxRetryError(_pool, url, reason) from reason
+        return new_retry
+
+
+def _build_session(config):
+    """Build a pooled keep-alive session with retry/backoff for RAWG calls"""
+    retry = BoundedRetry(
+        total=config['RAWG_MAX_RETRIES'],
+        backoff_factor=config['RAWG_BACKOFF_FACTOR'],
+        backoff_jitter=config['RAWG_BACKOFF_JITTER'],
+        backoff_max=config['RAWG_TIMEOUT'],
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config['RAWG_POOL_SIZE'],
+        pool_maxsize=config['RAWG_POOL_SIZE'],
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _get_breaker(config):
+    """Get the per-process circuit breaker guarding RAWG calls"""
+    global _breaker
+    
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(
+                    window_size=config['RAWG_BREAKER_WINDOW'],
+                    failure_rate=config['RAWG_BREAKER_FAILURE_RATE'],
+                    min_calls=config['RAWG_BREAKER_MIN_CALLS'],
+                    reset_timeout=config['RAWG_BREAKER_RESET_TIMEOUT']
+                )
+    return _breaker
+
+
+def _get_limiter(config):
+    """Get the host-wide RAWG token bucket, or None when rate limiting is disabled"""
+    if config['RAWG_RATE_LIMIT'] <= 0:
+        return None
+    
+    key = (config['RAWG_RATE_LIMIT_DB'], config['RAWG_RATE_LIMIT'], config['RAWG_RATE_BURST'])
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = TokenBucket(*key)
+        return _limiters[key]
+
+
+def _is_rawg_failure(error):
+    """Whether an exception means RAWG is unhealthy (client errors like 404 do not)"""
+    response = getattr(error, 'response', None)
+    if isinstance(error, requests.HTTPError) and response is not None:
+        return response.status_code >= 500 or response.status_code == 429
+    return True
+
+
+def _fill_cache(key, timeout, fn, args, stale_entry=None):
+    """
+    Call fn and store its result with a soft (fresh) and hard (stale) TTL
+    
+    Error results are never stored like successes: if a previous good entry
+    is still around it is served as last-known-good, otherwise the error is
+    negatively cached for the short RAWG_ERROR_CACHE_TIMEOUT.
+    """
+    config = current_app.config
+    value = fn(*args)
+    
+    if 'error' in value:
+        if stale_entry is not None and not stale_entry.get('is_error'):
+            current_app.logger.warning(f'Serving last-known-good {key}: {value["error"]}')
+            return stale_entry['value']
+        
+        error_timeout = config['RAWG_ERROR_CACHE_TIMEOUT']
+        if error_timeout:
+            entry = {'value': value, 'fresh_until': time.time() + error_timeout, 'is_error': True}
+            cache.set(key, entry, timeout=error_timeout)
+        return value
+    
+    stale_ttl = config['RAWG_SWR_STALE_TTL'] if config['RAWG_SWR_ENABLED'] else 0
+    entry = {'value': value, 'fresh_until': time.time() + timeout}
+    cache.set(key, entry, timeout=timeout + max(stale_ttl, config['RAWG_STALE_IF_ERROR_TTL']))
+    return value
+
+
+def _refresh_in_background(app, key, timeout, fn, args, stale_entry):
+    """Refresh a stale entry off the request path, once per key at a time"""
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    
+    def refresh():
+        try:
+            with app.app_context(), rate_priority(PRIORITY_BULK):
+                _fill_cache(key, timeout, fn, args, stale_entry=stale_entry)
+        except Exception as e:
+            app.logger.error(f'RAWG cache refresh failed for {key}: {str(e)}')
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+    
+    try:
+        get_executor('rawg-refresh', app.config['RAWG_SWR_REFRESH_WORKERS']).submit(refresh)
+    except RuntimeError:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+
+def swr_memoize(timeout):
+    """
+    Memoize a RAWG lookup with stale-while-revalidate semantics
+    
+    Entries are fresh for `timeout` seconds. When RAWG_SWR_ENABLED is set they
+    are kept for a further RAWG_SWR_STALE_TTL seconds, during which they are
+    served immediately while a background refresh runs; only a miss past the
+    hard TTL blocks on RAWG. Stale entries are also kept as last-known-good
+    data for RAWG_STALE_IF_ERROR_TTL in case RAWG fails or its circuit is open.
+    """
+    def decorator(fn):
+        prefix = f'rawg:{fn.__name__}'
+        
+        def cache_key(*args):
+            return ':'.join([prefix, *(str(arg) for arg in args)])
+        
+        def serve_entry(entry, args):
+            """Get the value to serve for a cached entry, or None if it must be refetched"""
+            if entry is None:
+                return None
+            if time.time() < entry['fresh_until']:
+                return entry['value']
+            if current_app.config['RAWG_SWR_ENABLED'] and not entry.get('is_error'):
+                app = current_app._get_current_object()
+                _refresh_in_background(app, cache_key(*args), timeout, fn, args, entry)
+                return entry['value']
+            return None
+        
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = cache_key(*args)
+            entry = cache.get(key)
+            value = serve_entry(entry, args)
+            if value is not None:
+                return value
+            return _fill_cache(key, timeout, fn, args, stale_entry=entry)
+        
+        def get_cached_many(*arg_tuples):
+            """Resolve many calls from the cache in one pass; misses map to None"""
+            entries = cache.get_many(*(cache_key(*args) for args in arg_tuples))
+            return [serve_entry(entry, args) for entry, args in zip(entries, arg_tuples)]
+        
+        wrapper.cache_key = cache_key
+        wrapper.get_cached_many = get_cached_many
+        return wrapper
+    return decorator
+
 
 class RAWGService:
     """Service for interacting with RAWG Video Games Database API"""
     
+    @staticmethod
+    def _get_session():
+        """Get the per-process pooled session, rebuilding it after a fork"""
+        global _session, _session_pid
+        
+        pid = os.getpid()
+        if _session is None or _session_pid != pid:
+            with _session_lock:
+                if _session is None or _session_pid != pid:
+                    _session = _build_session(current_app.config)
+                    _session_pid = pid
+        return _session
+    
+    @staticmethod
+    def _request(path, params=None, priority=PRIORITY_DEFAULT):
+        """
+        Perform a GET against the RAWG API and return the decoded JSON
+        
+        Concurrent identical requests within the process are coalesced into
+        a single outbound call whose result is shared by all callers. The
+        call then takes a token from the host-wide rate limiter at its
+        priority (queueing or being shed per RAWG_RATE_MAX_WAIT_*), and fails
+        fast with CircuitOpenError while RAWG is unhealthy.
+        """
+        flight_key = (path, tuple(sorted((params or {}).items())))
+        return rawg_flight.do(flight_key, RAWGService._send, path, params, effective_priority(priority))
+    
+    @staticmethod
+    def _send(path, params, priority):
+        """Send a rate-limited, circuit-broken request to RAWG"""
+        config = current_app.config
+        limiter = _get_limiter(config)
+        if limiter is not None:
+            limiter.acquire(priority, max_wait=config[f'RAWG_RATE_MAX_WAIT_{priority.upper()}'])
+        
+        return _get_breaker(config).call(RAWGService._fetch, path, params, is_failure=_is_rawg_failure)
+    
+    @staticmethod
+    def _fetch(path, params=None):
+        """Send the GET request to RAWG over the pooled session, retries included, within RAWG_CALL_TIMEOUT"""
+        request_params = {'key': RAWGService._get_api_key()}
+        if params:
+            request_params.update(params)
+        
+        config = current_app.config
+        # Leave room for a whole attempt after the last retry starts
+        token = _retry_cutoff.set(time.monotonic() + config['RAWG_CALL_TIMEOUT'] - config['RAWG_TIMEOUT'])
+        try:
+            response = RAWGService._get_session().get(
+                f'{RAWGService._get_base_url()}{path}',
+                params=request_params,
+                timeout=config['RAWG_TIMEOUT']
+            )
+        finally:
+            _retry_cutoff.reset(token)
+        response.raise_for_status()
+        return response.json()
+    
     @staticmethod
     def _get_api_key():
         """Get RAWG API key from config"""
@@ -18,6 +312,62 @@ class RAWGService:
         """Get RAWG base URL from config"""
         return current_app.config['RAWG_BASE_URL']
     
+    @staticmethod
+    def get_stats():
+        """Get runtime metrics for the RAWG client"""
+        limiter = _get_limiter(current_app.config)
+        return {
+            'single_flight': rawg_flight.stats(),
+            'circuit_breaker': _get_breaker(current_app.config).stats(),
+            'rate_limiter': limiter.stats() if limiter else None
+        }
+    
+    @staticmethod
+    def _today_bucket():
+        """Get today's date; date windows and cache keys are stable for the whole day"""
+        return date.today()
+    
+    @staticmethod
+    def _release_window(release_filter, today):
+        """Get the (start, end) release date window for a release filter"""
+        if release_filter == 'upcoming':
+            return today, today + timedelta(days=365)
+        elif release_filter == 'current':
+            return today - timedelta(days=180), today
+        else:  # 'both' - show games from past 2 years to 1 year future
+            return today - timedelta(days=730), today + timedelta(days=365)
+    
+    @staticmethod
+    def _release_dates(release_filter, today):
+        """Get the RAWG 'dates' parameter for a release filter"""
+        start, end = RAWGService._release_window(release_filter, today)
+        return f'{start.isoformat()},{end.isoformat()}'
+    
+    @staticmethod
+    def _normalize_search_params(page, page_size, genres, platforms, release_filter, search):
+        """Canonicalize search parameters so equivalent queries share a cache key"""
+        genre_slugs = sorted({g.strip().lower() for g in (genres or '').split(',') if g.strip()})
+        platform_ids = sorted(
+            {p.strip() for p in str(platforms or '').split(',') if p.strip()},
+            key=lambda p: (not p.isdigit(), int(p) if p.isdigit() else 0, p)
+        )
+        search_text = ' '.join((search or '').lower().split())
+        
+        return {
+            'page': int(page),
+            'page_size': int(page_size),
+            'genres': ','.join(genre_slugs) or None,
+            'platforms': ','.join(platform_ids) or None,
+            'release_filter': release_filter if release_filter in RELEASE_FILTERS else 'both',
+            'search': search_text or None
+        }
+    
+    @staticmethod
+    def _search_cache_key(normalized, today):
+        """Build the cache key for a normalized search and day bucket"""
+        canonical = json.dumps(dict(normalized, day=today.isoformat()), sort_keys=True)
+        return f'rawg:search:{hashlib.sha1(canonical.encode("utf-8")).hexdigest()}'
+    
     @staticmethod
     def search_games(page=1, page_size=20, genres=None, platforms=None, release_filter='both', search=None):
         """
@@ -30,115 +380,132 @@ class RAWGService:
             platforms: Comma-separated platform IDs (e.g., '4,187')
             release_filter: 'upcoming', 'current', or 'both'
             search: Search query string
+        
+        When RAWG_SEARCH_SOURCE is 'catalog' the query is answered from the
+        local catalog mirror instead of RAWG.
         """
-        base_url = RAWGService._get_base_url()
-        api_key = RAWGService._get_api_key()
+        normalized = RAWGService._normalize_search_params(
+            page, page_size, genres, platforms, release_filter, search
+        )
+        today = RAWGService._today_bucket()
+        
+        if current_app.config['RAWG_SEARCH_SOURCE'] == 'catalog':
+            return CatalogService.search(
+                page=normalized['page'],
+                page_size=normalized['page_size'],
+                genres=normalized['genres'],
+                platforms=normalized['platforms'],
+                search=normalized['search'],
+                released_between=RAWGService._release_window(normalized['release_filter'], today)
+            )
+        
+        cache_key = RAWGService._search_cache_key(normalized, today)
+        
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         params = {
-            'key': api_key,
-            'page': page,
-            'page_size': page_size,
-            'ordering': '-released'
+            'page': normalized['page'],
+            'page_size': normalized['page_size'],
+            'ordering': '-released',
+            'dates': RAWGService._release_dates(normalized['release_filter'], today)
         }
         
         # Add search query
-        if search:
-            params['search'] = search
+        if normalized['search']:
+            params['search'] = normalized['search']
         
         # Add genre filter
-        if genres:
-            params['genres'] = genres
+        if normalized['genres']:
+            params['genres'] = normalized['genres']
         
         # Add platform filter
-        if platforms:
-            params['platforms'] = platforms
-        
-        # Add date filters based on release_filter
-        today = datetime.now().strftime('%Y-%m-%d')
-        six_months_ago = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
-        two_years_ago = (datetime.now() - timedelta(days=730)).strftime('%Y-%m-%d')
-        one_year_from_now = (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d')
-        
-        if release_filter == 'upcoming':
-            params['dates'] = f'{today},{one_year_from_now}'
-        elif release_filter == 'current':
-            params['dates'] = f'{six_months_ago},{today}'
-        else:  # 'both' - show games from past 2 years to 1 year future
-            params['dates'] = f'{two_years_ago},{one_year_from_now}'
+        if normalized['platforms']:
+            params['platforms'] = normalized['platforms']
         
         try:
-            response = requests.get(f'{base_url}/games', params=params, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            return result
+            result = project_page(RAWGService._request('/games', params))
         except requests.RequestException as e:
             current_app.logger.error(f'RAWG API error: {str(e)}')
             return {'error': str(e), 'results': []}
+        
+        cache.set(cache_key, result, timeout=current_app.config['RAWG_SEARCH_CACHE_TIMEOUT'])
+        return result
     
     @staticmethod
-    @cache.memoize(timeout=21600)
+    @swr_memoize(timeout=21600)
     def get_game_details(game_id):
         """Get detailed information about a specific game"""
-        base_url = RAWGService._get_base_url()
-        api_key = RAWGService._get_api_key()
-        
-        params = {'key': api_key}
-        
         try:
-            response = requests.get(f'{base_url}/games/{game_id}', params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            details = RAWGService._request(f'/games/{game_id}', priority=PRIORITY_INTERACTIVE)
+            return project_game(details, DETAIL_FIELDS)
         except requests.RequestException as e:
             current_app.logger.error(f'RAWG API error: {str(e)}')
             return {'error': str(e)}
     
     @staticmethod
-    @cache.memoize(timeout=21600)
-    def get_game_screenshots(game_id):
-        """Get screenshots for a specific game"""
-        base_url = RAWGService._get_base_url()
-        api_key = RAWGService._get_api_key()
+    def get_game_details_many(game_ids):
+        """
+        Get details for many games, fetching only cache misses from RAWG
         
-        params = {'key': api_key}
+        Returns a (details, errors) pair of dicts keyed by game id.
+        """
+        config = current_app.config
+        details = {}
+        errors = {}
+        
+        cached = RAWGService.get_game_details.get_cached_many(*((game_id,) for game_id in game_ids))
+        misses = {}
+        executor = get_executor('rawg-fanout', config['RAWG_FANOUT_WORKERS'])
+        
+        for game_id, value in zip(game_ids, cached):
+            if value is not None and 'error' in value:
+                errors[game_id] = value['error']
+            elif value is not None:
+                details[game_id] = value
+            else:
+                misses[game_id] = submit_with_app_context(executor, RAWGService.get_game_details, game_id)
         
+        fetched, timed_out = gather(misses, config['RAWG_TIMEOUT'])
+        for game_id, value in fetched.items():
+            if game_id in timed_out:
+                errors[game_id] = 'Timed out fetching game details'
+            elif value is None:
+                errors[game_id] = 'Failed to fetch game details'
+            elif 'error' in value:
+                errors[game_id] = value['error']
+            else:
+                details[game_id] = value
+        
+        return details, errors
+    
+    @staticmethod
+    @swr_memoize(timeout=21600)
+    def get_game_screenshots(game_id):
+        """Get screenshots for a specific game"""
         try:
-            response = requests.get(f'{base_url}/games/{game_id}/screenshots', params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return RAWGService._request(f'/games/{game_id}/screenshots', priority=PRIORITY_INTERACTIVE)
         except requests.RequestException as e:
             current_app.logger.error(f'RAWG API error: {str(e)}')
             return {'error': str(e), 'results': []}
     
     @staticmethod
-    @cache.memoize(timeout=86400)  # Cache for 24 hours (genres don't change often)
+    @swr_memoize(timeout=86400)  # Cache for 24 hours (genres don't change often)
     def get_genres():
         """Get list of available genres"""
-        base_url = RAWGService._get_base_url()
-        api_key = RAWGService._get_api_key()
-        
-        params = {'key': api_key}
-        
         try:
-            response = requests.get(f'{base_url}/genres', params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return RAWGService._request('/genres')
         except requests.RequestException as e:
             current_app.logger.error(f'RAWG API error: {str(e)}')
             return {'error': str(e), 'results': []}
     
     @staticmethod
-    @cache.memoize(timeout=86400)  # Cache for 24 hours
+    @swr_memoize(timeout=86400)  # Cache for 24 hours
     def get_platforms():
         """Get list of available platforms"""
-        base_url = RAWGService._get_base_url()
-        api_key = RAWGService._get_api_key()
-        
-        params = {'key': api_key}
-        
         try:
-            response = requests.get(f'{base_url}/platforms', params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return RAWGService._request('/platforms')
         except requests.RequestException as e:
             current_app.logger.error(f'RAWG API error: {str(e)}')
             return {'error': str(e), 'results': []}
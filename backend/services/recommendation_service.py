@@ -0,0 +1,305 @@
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, CollectionVersion, Game, PrecomputedRecommendation, User
+from services.concurrency import get_executor, gather, submit_with_app_context
+from services.content_filter import get_content_filter
+from services.events import collection_changed, preferences_changed
+from services.played_games import PlayedGamesService
+from services.rate_limiter import PRIORITY_BULK, rate_priority
+from services.rawg_service import RAWGService, cache
+from services.scoring import Candidates
+from services.similarity_service import SimilarityService
+from services.taxonomy import TaxonomyIndex, TaxonomyService
+from services.upsert import bulk_upsert
+
+
+def _taxonomy_key(index, name):
+    """Canonical key for a genre/platform name, falling back to the name itself"""
+    return index.resolve(name) or str(name).strip().casefold()
+
+
+class SharedSearches:
+    """
+    RAWG search memo for one batch run
+    
+    Users with the same preferences and collection genres issue identical
+    searches; each distinct search is sent once per run at bulk priority.
+    Failed searches are not remembered.
+    """
+    
+    def __init__(self, priority=PRIORITY_BULK):
+        self.priority = priority
+        self.requested = 0
+        self._results = {}
+        self._lock = threading.Lock()
+    
+    def __call__(self, **params):
+        key = tuple(sorted(params.items()))
+        with self._lock:
+            self.requested += 1
+            if key in self._results:
+                return self._results[key]
+        
+        with rate_priority(self.priority):
+            result = RAWGService.search_games(**params)
+        
+        if 'error' not in result:
+            with self._lock:
+                self._results[key] = result
+        return result
+    
+    @property
+    def sent(self):
+        return len(self._results)
+
+
+class RecommendationService:
+    """Service that builds and caches the per-user recommendation feeds"""
+    
+    @staticmethod
+    def _cache_key(user_id, page):
+        return f'recommendations:{user_id}:{page}'
+    
+    @staticmethod
+    def fingerprint(user, include_day=True):
+        """
+        Hash everything the feeds are computed from
+        
+        Covers the user's preferences, their collection version and the
+        search cache's day bucket, so a cached feed is never served for
+        inputs it was not built from, even if an invalidation was missed.
+        Precomputed rows leave the day out and are bounded by
+        RECOMMENDATION_PRECOMPUTE_MAX_AGE instead, so a nightly run is not
+        discarded at midnight.
+        """
+        inputs = {
+            'genres': user.favorite_genres or [],
+            'platforms': user.favorite_platforms or [],
+            'collection': CollectionVersion.current(user.id)
+        }
+        if include_day:
+            inputs['day'] = RAWGService._today_bucket().isoformat()
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+    
+    @staticmethod
+    def get(user, page=1):
+        """Return the user's feeds for a page, from cache when the inputs are unchanged"""
+        config = current_app.config
+        cacheable = 1 <= page <= config['RECOMMENDATION_CACHE_PAGES']
+        key = RecommendationService._cache_key(user.id, page)
+        fingerprint = RecommendationService.fingerprint(user)
+        
+        if cacheable:
+            cached = cache.get(key)
+            if cached and cached['fingerprint'] == fingerprint:
+                return cached['feeds']
+        
+        feeds = None
+        if page == 1:
+            feeds = RecommendationService.get_precomputed(
+                user, RecommendationService.fingerprint(user, include_day=False)
+            )
+        if feeds is None:
+            feeds = RecommendationService.build(user, page)
+        
+        # Partial results are served but never cached
+        if cacheable and not feeds['timed_out']:
+            cache.set(
+                key,
+                {'fingerprint': fingerprint, 'feeds': feeds},
+                timeout=config['RECOMMENDATION_CACHE_TIMEOUT']
+            )
+        return feeds
+    
+    @staticmethod
+    def invalidate(user_id):
+        """Drop every cached page of a user's feeds"""
+        pages = current_app.config['RECOMMENDATION_CACHE_PAGES']
+        cache.delete_many(*(
+            RecommendationService._cache_key(user_id, page) for page in range(1, pages + 1)
+        ))
+    
+    @staticmethod
+    def get_precomputed(user, fingerprint):
+        """Get the user's precomputed first page if it is fresh and built from the current inputs"""
+        row = db.session.get(PrecomputedRecommendation, user.id)
+        if row is None or row.fingerprint != fingerprint:
+            return None
+        max_age = timedelta(seconds=current_app.config['RECOMMENDATION_PRECOMPUTE_MAX_AGE'])
+        if datetime.utcnow() - row.generated_at > max_age:
+            return None
+        return row.feeds
+    
+    @staticmethod
+    def precompute(chunk_size=None):
+        """
+        Compute and store the first page of every user's feeds
+        
+        Users are walked in id order, chunk_size at a time, with one upsert
+        and commit per chunk. Feeds cut short by the deadline are skipped so
+        those users keep being served live.
+        """
+        chunk_size = chunk_size or current_app.config['RECOMMENDATION_PRECOMPUTE_CHUNK_SIZE']
+        searches = SharedSearches()
+        stored = skipped = 0
+        last_id = 0
+        
+        while True:
+            users = User.query.filter(User.id > last_id).order_by(User.id).limit(chunk_size).all()
+            if not users:
+                break
+            
+            rows = []
+            for user in users:
+                # Fingerprint first, so a change made mid-build invalidates the row
+                fingerprint = RecommendationService.fingerprint(user, include_day=False)
+                feeds = RecommendationService.build(user, 1, search=searches)
+                if feeds['timed_out']:
+                    skipped += 1
+                    continue
+                rows.append({
+                    'user_id': user.id,
+                    'fingerprint': fingerprint,
+                    'feeds': feeds,
+                    'generated_at': datetime.utcnow()
+                })
+            
+            bulk_upsert(PrecomputedRecommendation, rows, ['user_id'])
+            db.session.commit()
+            stored += len(rows)
+            last_id = users[-1].id
+        
+        return {
+            'stored': stored,
+            'skipped': skipped,
+            'searches_requested': searches.requested,
+            'searches_sent': searches.sent
+        }
+    
+    @staticmethod
+    def build(user, page=1, search=None):
+        """Compute the preference and genre feeds for a user from RAWG"""
+        search = search or RAWGService.search_games
+        config = current_app.config
+        deadline = time.monotonic() + config['RECOMMENDATION_DEADLINE']
+        executor = get_executor('rawg-fanout', config['RAWG_FANOUT_WORKERS'])
+        content_filter = get_content_filter()
+        
+        # Start the taxonomy lookups while we read the user's collection
+        lookups = {}
+        if user.favorite_genres:
+            lookups['genres'] = submit_with_app_context(executor, TaxonomyService.genres)
+        if user.favorite_platforms:
+            lookups['platforms'] = submit_with_app_context(executor, TaxonomyService.platforms)
+        
+        played_rawg_ids = PlayedGamesService.get(user.id)
+        
+        wishlist_and_played = Game.query.filter(
+            Game.user_id == user.id,
+            Game.status.in_(['wishlist', 'played'])
+        ).all()
+        
+        user_genre_names = set()
+        for game in wishlist_and_played:
+            if game.genres:
+                user_genre_names.update(g.lower() for g in game.genres)
+        
+        if user_genre_names and 'genres' not in lookups:
+            lookups['genres'] = submit_with_app_context(executor, TaxonomyService.genres)
+        
+        taxonomy, timed_out = gather(lookups, deadline - time.monotonic())
+        
+        genre_index = taxonomy.get('genres') or TaxonomyIndex()
+        platform_index = taxonomy.get('platforms') or TaxonomyIndex()
+        
+        genres_param = ','.join(genre_index.resolve_many(user.favorite_genres)) or None
+        platforms_param = ','.join(platform_index.resolve_many(user.favorite_platforms)) or None
+        
+        # Both candidate searches are independent once their filters are known
+        searches = {
+            'preference_based': submit_with_app_context(
+                executor,
+                search,
+                page=page,
+                page_size=40,
+                genres=genres_param,
+                platforms=platforms_param,
+                release_filter='both'
+            )
+        }
+        
+        user_genre_slugs = genre_index.resolve_many(sorted(user_genre_names))
+        if user_genre_slugs:
+            searches['genre_based'] = submit_with_app_context(
+                executor,
+                search,
+                page=1,
+                page_size=40,
+                genres=','.join(user_genre_slugs),
+                platforms=platforms_param,
+                release_filter='both'
+            )
+        
+        candidates, searches_timed_out = gather(searches, deadline - time.monotonic())
+        timed_out.extend(searches_timed_out)
+        
+        def genre_key(genre):
+            return _taxonomy_key(genre_index, genre.get('name') or genre.get('slug'))
+        
+        def platform_key(platform):
+            platform = platform.get('platform') or {}
+            return _taxonomy_key(platform_index, platform.get('name') or platform.get('id'))
+        
+        # Collection genres weigh in proportion to how often the user saved them
+        collection_genres = Counter(
+            _taxonomy_key(genre_index, name) for game in wishlist_and_played for name in game.genres or []
+        )
+        total_saved = sum(collection_genres.values()) or 1
+        collection_profile = {key: count / total_saved for key, count in collection_genres.items()}
+        favorite_profile = dict(collection_profile)
+        for name in user.favorite_genres or []:
+            key = _taxonomy_key(genre_index, name)
+            favorite_profile[key] = favorite_profile.get(key, 0) + 1.0
+        platform_profile = {_taxonomy_key(platform_index, name): 1.0 for name in user.favorite_platforms or []}
+        
+        def eligible(page_result):
+            return [
+                game for game in (page_result or {}).get('results', [])
+                if game.get('id') not in played_rawg_ids and not content_filter.is_blocked(game)
+            ]
+        
+        preference_pool = Candidates(
+            eligible(candidates['preference_based']), genre_key=genre_key, platform_key=platform_key
+        )
+        preference_based = preference_pool.top_k(
+            20, favorite_profile, platform_profile, min_rating=3.0
+        )
+        
+        genre_pool = Candidates(
+            eligible(candidates.get('genre_based')), genre_key=genre_key, platform_key=platform_key
+        )
+        genre_based = genre_pool.top_k(
+            10, collection_profile, platform_profile, min_rating=3.5, require_genre=True
+        )
+        
+        collaborative = SimilarityService.recommend(
+            user.id, config['COLLABORATIVE_FEED_SIZE'], skip=content_filter.is_blocked
+        )
+        
+        return {
+            'preference_based': preference_based,
+            'genre_based': genre_based,
+            'collaborative': collaborative,
+            'timed_out': timed_out
+        }
+
+
+@collection_changed.connect
+@preferences_changed.connect
+def _invalidate_recommendations(sender, user_id, **extra):
+    RecommendationService.invalidate(user_id)
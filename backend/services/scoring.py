@@ -0,0 +1,127 @@
+from datetime import date
+import numpy as np
+
+# Relative weight of each signal in a candidate's score
+DEFAULT_WEIGHTS = {
+    'genre': 0.45,
+    'platform': 0.15,
+    'rating': 0.3,
+    'recency': 0.1
+}
+
+# A game released this many days ago gets half the recency score of a new one
+RECENCY_HALF_LIFE_DAYS = 730
+
+
+def _name_key(item):
+    return (item.get('name') or '').strip().casefold() or None
+
+
+def _platform_name_key(item):
+    return _name_key(item.get('platform') or {})
+
+
+def _released(value):
+    try:
+        return np.datetime64(value[:10], 'D') if value else np.datetime64('NaT')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def _multi_hot(key_lists, vocab):
+    matrix = np.zeros((len(key_lists), len(vocab)), dtype=np.float32)
+    rows = [row for row, keys in enumerate(key_lists) for _ in keys]
+    cols = [vocab[key] for keys in key_lists for key in keys]
+    matrix[np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)] = 1.0
+    return matrix
+
+
+class Candidates:
+    """
+    A pool of RAWG games encoded as NumPy arrays for vectorized ranking
+    
+    Genres and platforms become multi-hot rows over the pool's own
+    vocabulary; ``genre_key``/``platform_key`` map each nested RAWG object
+    to its vocabulary key (by default the case-folded name), so callers can
+    canonicalise names the same way they build the user's profile.
+    """
+    
+    def __init__(self, games, genre_key=_name_key, platform_key=_platform_name_key, today=None):
+        self.games = list(games)
+        genre_lists = [
+            list(dict.fromkeys(k for k in map(genre_key, game.get('genres') or []) if k))
+            for game in self.games
+        ]
+        platform_lists = [
+            list(dict.fromkeys(k for k in map(platform_key, game.get('platforms') or []) if k))
+            for game in self.games
+        ]
+        self.genre_vocab = {k: i for i, k in enumerate(dict.fromkeys(k for ks in genre_lists for k in ks))}
+        self.platform_vocab = {k: i for i, k in enumerate(dict.fromkeys(k for ks in platform_lists for k in ks))}
+        self.genres = _multi_hot(genre_lists, self.genre_vocab)
+        self.platforms = _multi_hot(platform_lists, self.platform_vocab)
+        
+        self.rating = np.array([game.get('rating') or 0.0 for game in self.games], dtype=np.float32)
+        released = np.array([_released(game.get('released')) for game in self.games], dtype='datetime64[D]')
+        age = (np.datetime64(today or date.today(), 'D') - released).astype(np.float32)
+        # Upcoming games count as brand new; unknown release dates get nothing
+        self.recency = np.where(
+            np.isnat(released), 0.0, 0.5 ** (np.clip(age, 0, None) / RECENCY_HALF_LIFE_DAYS)
+        ).astype(np.float32)
+    
+    def __len__(self):
+        return len(self.games)
+    
+    @staticmethod
+    def _profile(weights_by_key, vocab):
+        profile = np.zeros(len(vocab), dtype=np.float32)
+        for key, weight in (weights_by_key or {}).items():
+            if key in vocab:
+                profile[vocab[key]] += weight
+        return profile
+    
+    def scores(self, genre_profile=None, platform_profile=None, weights=DEFAULT_WEIGHTS):
+        """
+        Score every candidate against a user profile
+        
+        Profiles map vocabulary keys to weights. Genre fit is the cosine
+        similarity between the candidate's genres and the profile, platform
+        fit is 1 if the game is on any preferred platform. Returns the total
+        scores and the raw genre overlap (0 when no genre matches).
+        """
+        genres = self._profile(genre_profile, self.genre_vocab)
+        platforms = self._profile(platform_profile, self.platform_vocab)
+        
+        overlap = self.genres @ genres
+        norms = np.sqrt(self.genres.sum(axis=1)) * np.linalg.norm(genres)
+        genre_fit = np.divide(overlap, norms, out=np.zeros_like(overlap), where=norms > 0)
+        platform_fit = (self.platforms @ platforms > 0).astype(np.float32)
+        rating = np.clip(self.rating / 5.0, 0.0, 1.0)
+        
+        total = (
+            weights['genre'] * genre_fit
+            + weights['platform'] * platform_fit
+            + weights['rating'] * rating
+            + weights['recency'] * self.recency
+        )
+        return total, overlap
+    
+    def top_k(self, k, genre_profile=None, platform_profile=None, min_rating=0.0,
+              require_genre=False, weights=DEFAULT_WEIGHTS):
+        """Return the k best-scoring games, best first, skipping those below the floors"""
+        if not self.games or k <= 0:
+            return []
+        
+        total, overlap = self.scores(genre_profile, platform_profile, weights)
+        eligible = self.rating >= min_rating
+        if require_genre:
+            eligible &= overlap > 0
+        
+        k = min(k, int(eligible.sum()))
+        if k == 0:
+            return []
+        
+        total = np.where(eligible, total, -np.inf)
+        best = np.argpartition(-total, k - 1)[:k] if k < len(total) else np.arange(len(total))
+        best = best[np.argsort(-total[best], kind='stable')]
+        return [self.games[i] for i in best]
@@ -0,0 +1,197 @@
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from scipy import sparse
+from sqlalchemy import func, select
+from models import db, CollectionVersion, Game, GameSimilarity, JobCheckpoint
+
+CHECKPOINT_NAME = 'game_similarities'
+
+# How strongly saving a game with each status says the user likes it
+STATUS_WEIGHTS = {
+    'played': 2.0,
+    'wishlist': 1.0,
+    'interested': 1.0
+}
+
+INSERT_CHUNK_SIZE = 1000
+
+
+def _as_rawg_game(game):
+    """Shape a saved games row like a RAWG list result"""
+    return {
+        'id': game.rawg_id,
+        'name': game.title,
+        'background_image': game.cover_image,
+        'rating': game.rating,
+        'released': game.release_date,
+        'genres': [{'name': name} for name in game.genres or []],
+        'platforms': [{'platform': {'name': name}} for name in game.platforms or []]
+    }
+
+
+class SimilarityService:
+    """Item-to-item collaborative filtering over the games users have saved"""
+    
+    @staticmethod
+    def _collection_matrix():
+        """Load every saved game as a weighted, sparse users x games matrix"""
+        saved = db.session.execute(select(Game.user_id, Game.rawg_id, Game.status)).all()
+        users, items = {}, {}
+        rows, cols, weights = [], [], []
+        
+        for user_id, rawg_id, status in saved:
+            rows.append(users.setdefault(user_id, len(users)))
+            cols.append(items.setdefault(rawg_id, len(items)))
+            weights.append(STATUS_WEIGHTS.get(status, STATUS_WEIGHTS['wishlist']))
+        
+        matrix = sparse.coo_matrix(
+            (np.array(weights, dtype=np.float32), (rows, cols)),
+            shape=(len(users), len(items))
+        ).tocsc()
+        # A game saved twice by one user still counts once
+        matrix.data = np.minimum(matrix.data, STATUS_WEIGHTS['played'])
+        return matrix, np.array(list(items), dtype=np.int64)
+    
+    @staticmethod
+    def _changed_rawg_ids(since):
+        """RAWG ids in the collections of users whose collection changed after since"""
+        changed_users = select(CollectionVersion.user_id).where(CollectionVersion.updated_at > since)
+        return set(db.session.scalars(
+            select(Game.rawg_id).where(Game.user_id.in_(changed_users)).distinct()
+        ))
+    
+    @staticmethod
+    def _stale_rawg_ids(matrix, rawg_ids, changed):
+        """
+        RAWG ids whose stored neighbour list a change may have invalidated
+        
+        That is every game listing one of the changed games as a neighbour,
+        and every game with a stored neighbour nobody saves together with it
+        any more, e.g. after one user removed both.
+        """
+        columns = {int(rawg_id): i for i, rawg_id in enumerate(rawg_ids)}
+        stale, kept = set(), []
+        
+        for source, similar in db.session.execute(select(GameSimilarity.rawg_id, GameSimilarity.similar_rawg_id)):
+            if source not in columns:
+                continue
+            if similar in changed or similar not in columns:
+                stale.add(source)
+            else:
+                kept.append((source, similar))
+        
+        if kept:
+            sources = matrix[:, [columns[source] for source, _ in kept]]
+            similars = matrix[:, [columns[similar] for _, similar in kept]]
+            co_saved = np.asarray(sources.multiply(similars).sum(axis=0)).ravel()
+            stale.update(source for (source, _), count in zip(kept, co_saved) if count == 0)
+        return stale
+    
+    @staticmethod
+    def rebuild(full=False):
+        """
+        Recompute the top co-saved games per RAWG id
+        
+        Similarity is the cosine between two games' columns of the weighted
+        users x games matrix. Incremental runs only recompute games saved
+        by users whose collection changed since the last run, plus games
+        whose stored neighbours include one of those or are no longer
+        co-saved by anyone, so no stored pair outlives the users behind it;
+        other games' scores may drift slightly until the next full rebuild.
+        """
+        started = datetime.utcnow()
+        top_n = current_app.config['SIMILARITY_TOP_N']
+        state = db.session.get(JobCheckpoint, CHECKPOINT_NAME)
+        matrix, rawg_ids = SimilarityService._collection_matrix()
+        table = GameSimilarity.__table__
+        
+        if full or state is None:
+            full = True
+            targets = np.arange(len(rawg_ids))
+            db.session.execute(table.delete())
+        else:
+            changed = SimilarityService._changed_rawg_ids(state.checkpoint)
+            changed = list(changed | SimilarityService._stale_rawg_ids(matrix, rawg_ids, changed))
+            targets = np.flatnonzero(np.isin(rawg_ids, changed))
+            for start in range(0, len(changed), INSERT_CHUNK_SIZE):
+                db.session.execute(table.delete().where(
+                    table.c.rawg_id.in_(changed[start:start + INSERT_CHUNK_SIZE])
+                ))
+            # Drop games nobody has saved any more
+            saved = select(Game.rawg_id)
+            db.session.execute(table.delete().where(
+                table.c.rawg_id.not_in(saved) | table.c.similar_rawg_id.not_in(saved)
+            ))
+        
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+        co_saved = (matrix.T @ matrix[:, targets]).tocsc()
+        rows = []
+        
+        for col, target in enumerate(targets):
+            start, end = co_saved.indptr[col], co_saved.indptr[col + 1]
+            neighbours = co_saved.indices[start:end]
+            keep = neighbours != target
+            neighbours = neighbours[keep]
+            if not len(neighbours):
+                continue
+            
+            scores = co_saved.data[start:end][keep] / (norms[target] * norms[neighbours])
+            if len(scores) > top_n:
+                best = np.argpartition(-scores, top_n - 1)[:top_n]
+                neighbours, scores = neighbours[best], scores[best]
+            
+            rows.extend(
+                {'rawg_id': int(rawg_ids[target]), 'similar_rawg_id': int(rawg_ids[n]), 'score': float(s)}
+                for n, s in zip(neighbours, scores)
+            )
+        
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            db.session.execute(table.insert(), rows[start:start + INSERT_CHUNK_SIZE])
+        
+        if state is None:
+            db.session.add(JobCheckpoint(name=CHECKPOINT_NAME, checkpoint=started))
+        else:
+            state.checkpoint = started
+        db.session.commit()
+        
+        return {'games': len(targets), 'pairs': len(rows), 'full': full}
+    
+    @staticmethod
+    def recommend(user_id, limit, skip=None):
+        """
+        Games similar to the user's collection, best first, from stored similarities only
+        
+        Each saved game contributes its neighbours' scores weighted by its
+        status. Games the user already saved, and games for which skip
+        returns True, are left out.
+        """
+        saved = {
+            rawg_id: STATUS_WEIGHTS.get(status, STATUS_WEIGHTS['wishlist'])
+            for rawg_id, status in db.session.execute(
+                select(Game.rawg_id, Game.status).where(Game.user_id == user_id)
+            )
+        }
+        if not saved:
+            return []
+        
+        pairs = db.session.execute(
+            select(GameSimilarity.rawg_id, GameSimilarity.similar_rawg_id, GameSimilarity.score)
+            .where(GameSimilarity.rawg_id.in_(list(saved)))
+        )
+        scores = {}
+        for source, similar, score in pairs:
+            if similar not in saved:
+                scores[similar] = scores.get(similar, 0.0) + saved[source] * score
+        
+        # Over-fetch so skipped games can be replaced
+        ranked = sorted(scores, key=lambda rawg_id: (-scores[rawg_id], rawg_id))[:limit * 3]
+        # One saved row per game is enough for its display fields
+        first_saved = select(func.min(Game.id)).where(Game.rawg_id.in_(ranked)).group_by(Game.rawg_id)
+        details = {
+            game.rawg_id: _as_rawg_game(game)
+            for game in Game.query.filter(Game.id.in_(first_saved))
+        }
+        
+        games = (details[rawg_id] for rawg_id in ranked if rawg_id in details)
+        return [game for game in games if not (skip and skip(game))][:limit]
@@ -0,0 +1,66 @@
+import copy
+import threading
+
+
+class _Call:
+    """An in-flight call that concurrent callers can wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one in-flight execution per key"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executed = 0
+        self._coalesced = 0
+    
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn once for all concurrent callers using the same key
+        
+        The first caller executes fn; callers arriving while it is in flight
+        wait for it and receive a deep copy of its result (or its exception),
+        so they can mutate what they get back without affecting each other.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+    
+    def stats(self):
+        """Get counts of executed and coalesced calls"""
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls)
+            }
@@ -0,0 +1,97 @@
+import time
+from types import MappingProxyType
+from flask import current_app
+from services.rawg_service import RAWGService
+
+# Extra names users and older clients use for RAWG genres/platforms, by slug
+GENRE_ALIASES = {
+    'role-playing-games-rpg': ('rpg', 'role playing', 'role-playing'),
+    'massively-multiplayer': ('mmo', 'mmorpg'),
+    'board-games': ('board game',),
+    'card': ('card game', 'card games')
+}
+PLATFORM_ALIASES = {
+    'pc': ('windows',),
+    'playstation5': ('ps5', 'playstation 5'),
+    'playstation4': ('ps4', 'playstation 4'),
+    'xbox-series-x': ('xbox series x', 'xbox series s', 'xbox series x|s', 'xsx'),
+    'xbox-one': ('xbox one', 'xb1'),
+    'nintendo-switch': ('switch', 'nintendo switch'),
+    'macos': ('mac', 'macos', 'os x')
+}
+
+
+class TaxonomyIndex:
+    """
+    Immutable case-folded lookup from any name, slug, id or alias to one key
+    
+    Genres resolve to their slug and platforms to their id (as a string),
+    which are the values RAWG expects in search filters.
+    """
+    
+    def __init__(self, items=(), key='slug', aliases=None):
+        lookup = {}
+        names = {}
+        aliases = aliases or {}
+        
+        for item in items:
+            value = str(item[key])
+            names[value] = item.get('name')
+            candidates = [item.get('name'), item.get('slug'), str(item.get('id', ''))]
+            candidates.extend(aliases.get(item.get('slug'), ()))
+            for candidate in candidates:
+                if candidate:
+                    lookup.setdefault(candidate.strip().casefold(), value)
+        
+        self._lookup = MappingProxyType(lookup)
+        self.names = MappingProxyType(names)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def resolve(self, name):
+        """Translate a name, slug, id or alias into its key, or None if unknown"""
+        if name is None:
+            return None
+        return self._lookup.get(str(name).strip().casefold())
+    
+    def resolve_many(self, names):
+        """Translate many names, dropping unknown ones and duplicates, keeping order"""
+        resolved = (self.resolve(name) for name in names or ())
+        return list(dict.fromkeys(value for value in resolved if value is not None))
+
+
+class TaxonomyService:
+    """Genre and platform lookup indexes, built once per payload and kept in memory"""
+    
+    @staticmethod
+    def _get_index(name, fetch, key, aliases):
+        app = current_app._get_current_object()
+        indexes = app.extensions.setdefault('taxonomy', {})
+        cached = indexes.get(name)
+        
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+        
+        payload = fetch()
+        if 'error' in payload:
+            # Keep serving the previous index; retry soon
+            index = cached[0] if cached is not None else TaxonomyIndex()
+            ttl = app.config['RAWG_ERROR_CACHE_TIMEOUT']
+        else:
+            index = TaxonomyIndex(payload.get('results', []), key=key, aliases=aliases)
+            ttl = app.config['TAXONOMY_INDEX_TTL']
+        
+        indexes[name] = (index, time.monotonic() + ttl)
+        return index
+    
+    @staticmethod
+    def genres():
+        """Get the genre index (resolving to slugs)"""
+        return TaxonomyService._get_index('genres', RAWGService.get_genres, 'slug', GENRE_ALIASES)
+    
+    @staticmethod
+    def platforms():
+        """Get the platform index (resolving to ids)"""
+        return TaxonomyService._get_index('platforms', RAWGService.get_platforms, 'id', PLATFORM_ALIASES)
+
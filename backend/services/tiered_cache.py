@@ -0,0 +1,85 @@
+from cachelib import SimpleCache
+from flask_caching.backends.base import BaseCache
+from werkzeug.utils import import_string
+
+
+class TieredCache(BaseCache):
+    """
+    Two-tier cache: a small bounded in-process L1 in front of a shared L2
+    
+    Reads check L1, then L2 (promoting hits into L1); writes go to both.
+    L1 entries live for at most CACHE_L1_TIMEOUT seconds so that writes and
+    deletes made by other workers through L2 become visible quickly.
+    
+    The L2 backend is any flask_caching backend, selected with CACHE_L2_TYPE
+    (e.g. 'FileSystemCache' shared through CACHE_DIR by all workers on a host,
+    'RedisCache', or a dotted import path to a custom backend class).
+    """
+    
+    def __init__(self, l2, l1_threshold=500, l1_timeout=60, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.l1 = SimpleCache(threshold=l1_threshold, default_timeout=l1_timeout)
+        self.l2 = l2
+        self.l1_timeout = l1_timeout
+    
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        l2_type = config.get('CACHE_L2_TYPE', 'FileSystemCache')
+        if '.' not in l2_type:
+            l2_type = f'flask_caching.backends.{l2_type}'
+        
+        l2_config = dict(config, CACHE_THRESHOLD=config.get('CACHE_L2_THRESHOLD', config['CACHE_THRESHOLD']))
+        l2 = import_string(l2_type).factory(app, l2_config, [], dict(kwargs))
+        
+        return cls(
+            l2,
+            l1_threshold=config.get('CACHE_L1_THRESHOLD', 500),
+            l1_timeout=config.get('CACHE_L1_TIMEOUT', 60),
+            **kwargs
+        )
+    
+    def _l1_timeout(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        if timeout == 0:
+            return self.l1_timeout
+        return min(timeout, self.l1_timeout)
+    
+    def get(self, key):
+        value = self.l1.get(key)
+        if value is None:
+            value = self.l2.get(key)
+            if value is not None:
+                self.l1.set(key, value, timeout=self.l1_timeout)
+        return value
+    
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        result = self.l2.set(key, value, timeout=timeout)
+        self.l1.set(key, value, timeout=self._l1_timeout(timeout))
+        return result
+    
+    def add(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        added = self.l2.add(key, value, timeout=timeout)
+        if added:
+            self.l1.set(key, value, timeout=self._l1_timeout(timeout))
+        return added
+    
+    def delete(self, key):
+        self.l1.delete(key)
+        return self.l2.delete(key)
+    
+    def has(self, key):
+        return self.l1.has(key) or self.l2.has(key)
+    
+    def clear(self):
+        self.l1.clear()
+        return self.l2.clear()
+    
+    def inc(self, key, delta=1):
+        self.l1.delete(key)
+        return self.l2.inc(key, delta=delta)
+    
+    def dec(self, key, delta=1):
+        self.l1.delete(key)
+        return self.l2.dec(key, delta=delta)
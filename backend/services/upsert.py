@@ -0,0 +1,44 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+DIALECT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+
+def bulk_upsert(table, rows, conflict_columns, update_columns=None, update_values=None):
+    """
+    Insert rows, updating existing ones, with a single INSERT ... ON CONFLICT
+    
+    Args:
+        table: Model class or Table to write to
+        rows: List of dicts with the same keys
+        conflict_columns: Columns of the unique constraint to upsert on
+        update_columns: Columns to overwrite on conflict (defaults to every
+            non-conflict column present in the rows)
+        update_values: Column -> SQL expression to set on conflict instead of
+            the incoming value, e.g. ``{'version': table.c.version + 1}``
+    """
+    if not rows:
+        return
+    
+    table = getattr(table, '__table__', table)
+    dialect = db.session.get_bind().dialect.name
+    insert = DIALECT_INSERTS.get(dialect)
+    
+    if insert is None:
+        raise ValueError(f'Upserts are not supported on {dialect}')
+    
+    if update_columns is None:
+        update_columns = [c for c in rows[0] if c not in conflict_columns]
+    
+    stmt = insert(table).values(rows)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    set_.update(update_values or {})
+    if set_:
+        stmt = stmt.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+    
+    db.session.execute(stmt)
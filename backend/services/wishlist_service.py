@@ -0,0 +1,206 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import literal, select, tuple_
+from models import db, CollectionVersion, Game
+from services.upsert import bulk_upsert
+
+STATUSES = ('wishlist', 'played', 'interested')
+
+# Largest value of the INTEGER games.rawg_id column
+MAX_RAWG_ID = 2 ** 31 - 1
+
+# Sort key -> (column, descending)
+SORTS = {
+    'added_at': (Game.added_at, True),
+    'rating': (Game.rating, True),
+    'release_date': (Game.release_date, True),
+    'title': (Game.title, False)
+}
+
+
+class WishlistService:
+    """Filtering, sorting and keyset pagination of a user's saved games"""
+    
+    @staticmethod
+    def validate(status=None, sort='added_at'):
+        """Raise ValueError for an unknown status or sort key"""
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Invalid status. Must be one of: {', '.join(STATUSES)}")
+        if sort not in SORTS:
+            raise ValueError(f"Invalid sort. Must be one of: {', '.join(SORTS)}")
+    
+    @staticmethod
+    def query(user_id, status=None, sort='added_at'):
+        """Query a user's games, optionally by status, in a stable order for the sort key"""
+        column, descending = SORTS[sort]
+        query = Game.query.filter(Game.user_id == user_id)
+        if status is not None:
+            query = query.filter(Game.status == status)
+        
+        if descending:
+            return query.order_by(column.desc().nulls_last(), Game.id.desc())
+        return query.order_by(column.asc().nulls_last(), Game.id.asc())
+    
+    @staticmethod
+    def encode_cursor(sort, game):
+        """Opaque cursor pointing just past a game in the given sort order"""
+        value = getattr(game, sort)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps([sort, value, game.id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(sort, cursor):
+        """Decode a cursor into (value, id), raising ValueError if it is not for this sort"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            cursor_sort, value, game_id = json.loads(base64.urlsafe_b64decode(padded))
+            if sort == 'added_at' and value is not None:
+                value = datetime.fromisoformat(value)
+        except (binascii.Error, ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+        
+        if cursor_sort != sort or not isinstance(game_id, int):
+            raise ValueError('Invalid cursor')
+        return value, game_id
+    
+    @staticmethod
+    def page(user_id, limit, status=None, sort='added_at', cursor=None):
+        """
+        Get one page of games and the cursor for the next page (None on the last page)
+        
+        Games with a value in the sort column come first, then those
+        without one, each in (<sort column>, id) order on the
+        (user_id[, status], <sort column>, id) index: the first phase seeks
+        past the cursor with a row-value comparison, the NULL phase by id
+        alone. A page is one bounded range scan, or two where it crosses
+        from one phase to the next, never an OFFSET.
+        """
+        column, descending = SORTS[sort]
+        value, game_id = WishlistService.decode_cursor(sort, cursor) if cursor else (None, None)
+        direction = (lambda c: c.desc()) if descending else (lambda c: c.asc())
+        
+        query = Game.query.filter(Game.user_id == user_id)
+        if status is not None:
+            query = query.filter(Game.status == status)
+        
+        games = []
+        if cursor is None or value is not None:
+            valued = query.filter(column.is_not(None))
+            if cursor:
+                position, after = tuple_(column, Game.id), tuple_(literal(value, column.type), game_id)
+                valued = valued.filter(position < after if descending else position > after)
+            # Plain DESC, not NULLS LAST: NULLs are filtered out, and this matches a backward index scan
+            games = valued.order_by(direction(column), direction(Game.id)).limit(limit + 1).all()
+        
+        if len(games) <= limit and column.nullable:
+            blank = query.filter(column.is_(None))
+            if cursor and value is None:
+                blank = blank.filter(Game.id < game_id if descending else Game.id > game_id)
+            games += blank.order_by(direction(Game.id)).limit(limit + 1 - len(games)).all()
+        
+        next_cursor = None
+        if len(games) > limit:
+            games = games[:limit]
+            next_cursor = WishlistService.encode_cursor(sort, games[-1])
+        return games, next_cursor
+    
+    @staticmethod
+    def _bulk_row(user_id, item):
+        """Validate one bulk item into a games row, raising ValueError if it is unusable"""
+        if not isinstance(item, dict):
+            raise ValueError('Each game must be an object')
+        if not all(k in item for k in ['rawg_id', 'title']):
+            raise ValueError('Missing required fields (rawg_id, title)')
+        if not isinstance(item['rawg_id'], int) or isinstance(item['rawg_id'], bool):
+            raise ValueError('rawg_id must be an integer')
+        if not 1 <= item['rawg_id'] <= MAX_RAWG_ID:
+            raise ValueError(f'rawg_id must be between 1 and {MAX_RAWG_ID}')
+        
+        if not isinstance(item['title'], str) or not item['title'].strip():
+            raise ValueError('title must be a non-empty string')
+        
+        # Bad values would fail the whole chunk's INSERT, so reject them here
+        for field, max_length in (('title', 255), ('cover_image', 500), ('release_date', 50)):
+            value = item.get(field)
+            if value is not None and (not isinstance(value, str) or len(value) > max_length):
+                raise ValueError(f'{field} must be a string of at most {max_length} characters')
+        
+        rating = item.get('rating')
+        if rating is not None and (not isinstance(rating, (int, float)) or isinstance(rating, bool)):
+            raise ValueError('rating must be a number')
+        
+        for field in ('genres', 'platforms'):
+            values = item.get(field, [])
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                raise ValueError(f'{field} must be a list of strings')
+        
+        status = item.get('status', 'wishlist')
+        if status not in STATUSES:
+            raise ValueError(f"Invalid status. Must be one of: {', '.join(STATUSES)}")
+        
+        return {
+            'user_id': user_id,
+            'rawg_id': item['rawg_id'],
+            'title': item['title'],
+            'cover_image': item.get('cover_image'),
+            'rating': item.get('rating'),
+            'release_date': item.get('release_date'),
+            'status': status,
+            'added_at': datetime.utcnow(),
+            'genres': item.get('genres', []),
+            'platforms': item.get('platforms', [])
+        }
+    
+    @staticmethod
+    def save_many(user_id, items):
+        """
+        Add or update many games in one transaction
+        
+        Valid items are written with INSERT ... ON CONFLICT (user_id, rawg_id)
+        in chunks; like add_to_wishlist, a game that is already saved only
+        has its status updated. If a rawg_id appears more than once, the
+        last occurrence wins. Returns one result per item, in order, and
+        does not commit.
+        """
+        results = [None] * len(items)
+        rows = {}
+        
+        for index, item in enumerate(items):
+            try:
+                row = WishlistService._bulk_row(user_id, item)
+            except ValueError as e:
+                results[index] = {'index': index, 'result': 'error', 'error': str(e)}
+                continue
+            
+            previous = rows.pop(row['rawg_id'], None)
+            if previous is not None:
+                results[previous[0]] = {'index': previous[0], 'rawg_id': row['rawg_id'], 'result': 'duplicate'}
+            rows[row['rawg_id']] = (index, row)
+        
+        pending = list(rows.values())
+        chunk_size = current_app.config['WISHLIST_BULK_CHUNK_SIZE']
+        
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            rawg_ids = [row['rawg_id'] for _, row in chunk]
+            existing = set(db.session.scalars(
+                select(Game.rawg_id).where(Game.user_id == user_id, Game.rawg_id.in_(rawg_ids))
+            ))
+            bulk_upsert(Game, [row for _, row in chunk], ['user_id', 'rawg_id'], update_columns=['status'])
+            
+            for index, row in chunk:
+                results[index] = {
+                    'index': index,
+                    'rawg_id': row['rawg_id'],
+                    'result': 'updated' if row['rawg_id'] in existing else 'created',
+                    'status': row['status']
+                }
+        
+        if pending:
+            CollectionVersion.bump(user_id)
+        return results
@@ -4,10 +4,11 @@ Test configuration and fixtures for pytest
 import os
 import pytest
 from app import create_app
+from config import Config
 from models import db, User, Game
 
 
-class TestConfig:
+class TestConfig(Config):
     """Test configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
@@ -15,13 +16,17 @@ class TestConfig:
     JWT_SECRET_KEY = 'test-jwt-secret-key'
     SECRET_KEY = 'test-secret-key'
     CACHE_TYPE = 'SimpleCache'
+    RAWG_RATE_LIMIT = 0
+    BCRYPT_ROUNDS = 4
 
 
 @pytest.fixture(scope='function')
-def app():
+def app(monkeypatch, tmp_path):
     """Create application for testing"""
-    app = create_app()
-    app.config.from_object(TestConfig)
+    # Start every test with a closed RAWG circuit breaker
+    monkeypatch.setattr('services.rawg_service._breaker', None)
+    app = create_app(TestConfig)
+    app.config['PASSWORD_HASH_SLOTS_DB'] = str(tmp_path / 'password-slots.sqlite3')
     
     with app.app_context():
         db.create_all()
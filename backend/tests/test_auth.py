@@ -117,6 +117,62 @@ class TestAuthLogin:
         })
         
         assert response.status_code == 401
+    
+    def test_login_rehashes_at_configured_cost(self, client, app):
+        """Test that a hash made at another cost is upgraded on successful login"""
+        import bcrypt
+        with app.app_context():
+            user = User(username='legacy', email='legacy@example.com')
+            user.hashed_password = bcrypt.hashpw(b'oldpassword', bcrypt.gensalt(rounds=5)).decode('utf-8')
+            db.session.add(user)
+            db.session.commit()
+        
+        response = client.post('/api/auth/login', json={'username': 'legacy', 'password': 'oldpassword'})
+        
+        assert response.status_code == 200
+        with app.app_context():
+            user = User.query.filter_by(username='legacy').first()
+            assert user.hashed_password.startswith('$2b$04$')
+            assert not user.password_needs_rehash()
+            assert user.check_password('oldpassword')
+    
+    def test_login_sheds_load_when_hashing_is_saturated(self, client, app):
+        """Test that logins get 503 instead of queueing behind a full hashing pool"""
+        from services.password_service import _get_semaphore
+        from services.host_semaphore import HostSemaphore
+        client.post('/api/auth/signup', json={
+            'username': 'user', 'email': 'user@example.com', 'password': 'correctpassword'
+        })
+        app.config['PASSWORD_HASH_MAX_PENDING'] = 1
+        # Another worker process holds the only slot
+        other_worker = HostSemaphore(app.config['PASSWORD_HASH_SLOTS_DB'], 1, name='password-hash')
+        lease = other_worker.acquire()
+        
+        response = client.post('/api/auth/login', json={'username': 'user', 'password': 'correctpassword'})
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        
+        other_worker.release(lease)
+        response = client.post('/api/auth/login', json={'username': 'user', 'password': 'correctpassword'})
+        assert response.status_code == 200
+        assert _get_semaphore(app.config).try_acquire() is not None
+    
+    def test_semaphore_slots_are_shared_and_leases_expire(self, tmp_path):
+        """Test that semaphore instances on one file share a limit and reclaim expired leases"""
+        from services.host_semaphore import HostSemaphore
+        path = str(tmp_path / 'slots.sqlite3')
+        worker_a = HostSemaphore(path, limit=1, name='hash', lease_timeout=0.2)
+        worker_b = HostSemaphore(path, limit=1, name='hash', lease_timeout=0.2)
+        
+        lease = worker_a.acquire()
+        assert lease is not None
+        assert worker_b.acquire(max_wait=0.05) is None
+        worker_a.release(lease)
+        assert worker_b.try_acquire() is not None
+        
+        # A holder that never releases loses its slot once the lease runs out
+        assert worker_a.acquire(max_wait=1) is not None
 
 
 class TestAuthProfile:
@@ -0,0 +1,228 @@
+"""
+Tests for the local RAWG catalog mirror
+"""
+import json
+import threading
+import pytest
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from models import db, CatalogGame, CatalogSyncState
+from services.rawg_service import RAWGService
+
+
+def make_game(rawg_id, name, days_ago, genres, platforms, rating=4.0):
+    released = (date.today() - timedelta(days=days_ago)).isoformat()
+    return {
+        'id': rawg_id,
+        'name': name,
+        'slug': name.lower().replace(' ', '-'),
+        'rating': rating,
+        'released': released,
+        'updated': f'2024-05-{rawg_id:02d}T10:00:00',
+        'background_image': f'https://example.com/{rawg_id}.jpg',
+        'genres': [{'id': i, 'name': g.title(), 'slug': g} for i, g in enumerate(genres)],
+        'platforms': [{'platform': {'id': p, 'name': f'Platform {p}', 'slug': f'p{p}'}} for p in platforms],
+        'tags': [{'id': 1, 'name': 'Singleplayer'}]
+    }
+
+
+class StubRAWG:
+    """A local HTTP server serving paginated /games responses"""
+    
+    def __init__(self, games, page_size=2):
+        self.games = games
+        self.page_size = page_size
+        self.requests = []
+        self.fail_pages = set()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stub.requests.append((url.path, params))
+                page = int(params.get('page', 1))
+                
+                if page in stub.fail_pages:
+                    stub.fail_pages.discard(page)
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                
+                start = (page - 1) * stub.page_size
+                results = stub.games[start:start + stub.page_size]
+                has_next = start + stub.page_size < len(stub.games)
+                body = json.dumps({
+                    'count': len(stub.games),
+                    'next': f'http://stub/games?page={page + 1}' if has_next else None,
+                    'results': results
+                }).encode('utf-8')
+                
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_rawg(app, monkeypatch):
+    stub = StubRAWG([
+        make_game(1, 'Space Shooter', 100, ['action', 'shooter'], [4, 187]),
+        make_game(2, 'Farm Life', 300, ['simulation'], [4]),
+        make_game(3, 'Dragon Quest', 30, ['role-playing-games-rpg'], [187], rating=4.6),
+        make_game(4, 'Old Classic', 9000, ['action'], [4])
+    ])
+    app.config['RAWG_BASE_URL'] = stub.url
+    app.config['RAWG_MAX_RETRIES'] = 0
+    app.config['CATALOG_SYNC_PAGE_SIZE'] = 2
+    # Build a session with the stub's retry settings, and drop it afterwards
+    monkeypatch.setattr('services.rawg_service._session', None)
+    yield stub
+    stub.close()
+
+
+class TestCatalogSync:
+    """Tests for the catalog sync command"""
+    
+    def test_sync_mirrors_all_pages(self, app, runner, stub_rawg):
+        """Test that a sync pages through RAWG and upserts every game"""
+        result = runner.invoke(args=['catalog', 'sync'])
+        
+        assert result.exit_code == 0, result.output
+        assert 'Synced 4 games from 2 pages (complete)' in result.output
+        assert CatalogGame.query.count() == 4
+        
+        game = db.session.get(CatalogGame, 1)
+        assert game.name == 'Space Shooter'
+        assert [g['slug'] for g in game.genres] == ['action', 'shooter']
+        assert [r[1]['ordering'] for r in stub_rawg.requests] == ['updated', 'updated']
+        
+        state = db.session.get(CatalogSyncState, 'rawg_games')
+        assert state.next_page is None
+        assert state.synced_until is not None
+    
+    def test_sync_resumes_from_checkpoint(self, app, runner, stub_rawg):
+        """Test that an interrupted sync resumes from the failed page"""
+        stub_rawg.fail_pages.add(2)
+        
+        failed = runner.invoke(args=['catalog', 'sync'])
+        assert failed.exit_code != 0
+        assert CatalogGame.query.count() == 2
+        assert db.session.get(CatalogSyncState, 'rawg_games').next_page == 2
+        
+        stub_rawg.requests.clear()
+        result = runner.invoke(args=['catalog', 'sync'])
+        
+        assert result.exit_code == 0, result.output
+        assert [r[1]['page'] for r in stub_rawg.requests] == ['2']
+        assert CatalogGame.query.count() == 4
+    
+    def test_incremental_sync_requests_updated_window(self, app, runner, stub_rawg):
+        """Test that later syncs only ask RAWG for recently updated games"""
+        runner.invoke(args=['catalog', 'sync'])
+        stub_rawg.games[0]['name'] = 'Space Shooter Remastered'
+        stub_rawg.requests.clear()
+        
+        runner.invoke(args=['catalog', 'sync'])
+        
+        assert all('updated' in params for _, params in stub_rawg.requests)
+        db.session.expire_all()
+        assert db.session.get(CatalogGame, 1).name == 'Space Shooter Remastered'
+        assert CatalogGame.query.count() == 4
+
+
+class TestCatalogSearch:
+    """Tests for answering search_games from the catalog"""
+    
+    @pytest.fixture(autouse=True)
+    def synced(self, app, runner, stub_rawg):
+        runner.invoke(args=['catalog', 'sync'])
+        app.config['RAWG_SEARCH_SOURCE'] = 'catalog'
+        stub_rawg.requests.clear()
+    
+    def test_search_filters_by_genre_and_platform(self, stub_rawg):
+        """Test genre and platform filters against the local index tables"""
+        result = RAWGService.search_games(genres='action', platforms='187')
+        
+        assert [g['id'] for g in result['results']] == [1]
+        assert stub_rawg.requests == []
+    
+    def test_search_text_and_release_window(self):
+        """Test text search and that the release window excludes old games"""
+        assert [g['id'] for g in RAWGService.search_games(search='DRAGON')['results']] == [3]
+        assert RAWGService.search_games(search='classic')['results'] == []
+    
+    def test_search_orders_by_release_and_paginates(self):
+        """Test newest-first ordering and RAWG-style pagination"""
+        first = RAWGService.search_games(page=1, page_size=2)
+        second = RAWGService.search_games(page=2, page_size=2)
+        
+        assert [g['id'] for g in first['results']] == [3, 1]
+        assert first['count'] == 3
+        assert first['next'] == 2
+        assert [g['id'] for g in second['results']] == [2]
+        assert second['next'] is None
+    
+    def test_search_matches_words_not_wildcards(self, app):
+        """Test word and prefix matching, with % and _ taken literally"""
+        from services.catalog_service import CatalogService
+        CatalogService.upsert_games([
+            make_game(10, '1000 Juice', 10, ['action'], [4]),
+            make_game(11, '100% Orange Juice', 10, ['action'], [4]),
+            make_game(12, 'HalfXLife', 10, ['action'], [4]),
+            make_game(13, 'Half-Life', 10, ['action'], [4])
+        ])
+        
+        def ids(search):
+            return sorted(g['id'] for g in RAWGService.search_games(search=search)['results'])
+        
+        assert ids('100%') == [11]
+        assert ids('100') == [10, 11]
+        assert ids('half_life') == []
+        assert ids('half life') == [13]
+        assert ids('juice orange') == [11]
+        assert ids('drag') == [3]
+    
+    def test_search_uses_word_index(self, app):
+        """Test that text search is an index lookup on catalog_game_words"""
+        from sqlalchemy import event
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            RAWGService.search_games(search='dragon qu')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        with db.engine.connect() as conn:
+            plans = [
+                ' '.join(row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters))
+                for statement, parameters in statements if 'catalog_game_words' in statement
+            ]
+        assert plans
+        assert all('SCAN catalog_games' not in plan and 'SCAN catalog_game_words' not in plan for plan in plans)
+    
+    def test_count_is_capped(self, app):
+        """Test that the total stops at the configured limit"""
+        app.config['CATALOG_SEARCH_COUNT_LIMIT'] = 2
+        
+        result = RAWGService.search_games(page=1, page_size=1)
+        
+        assert result['count'] == 2
+        assert result['next'] == 2
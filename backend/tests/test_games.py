@@ -85,6 +85,92 @@ class TestGamesSearch:
         assert len(response.json['results']) == 1
         assert response.json['results'][0]['name'] == 'Normal Game'
 
+    
+    @patch('routes.games.RAWGService.search_games')
+    def test_filter_matches_whole_words_only(self, mock_search, client, auth_headers):
+        """Test that keywords inside mainstream titles are not filtered"""
+        mock_search.return_value = {
+            'results': [
+                {'id': 1, 'name': "Assassin's Creed Mirage"},
+                {'id': 2, 'name': 'Classic Racing'},
+                {'id': 3, 'name': 'Sexy Beach 18+'},
+                {'id': 4, 'name': 'Middlesex Detective'},
+                {'id': 5, 'name': 'Ass Hunter'}
+            ],
+            'next': None
+        }
+        
+        response = client.get('/api/games/search', headers=auth_headers)
+        
+        assert [g['id'] for g in response.json['results']] == [1, 2, 4]
+    
+    @patch('routes.games.RAWGService.search_games')
+    def test_filter_uses_tags_and_esrb_rating(self, mock_search, client, auth_headers):
+        """Test that RAWG tags and ESRB ratings also block games"""
+        mock_search.return_value = {
+            'results': [
+                {'id': 1, 'name': 'Harmless', 'tags': [{'slug': 'singleplayer'}]},
+                {'id': 2, 'name': 'Tagged', 'tags': [{'slug': 'nsfw'}]},
+                {'id': 3, 'name': 'Rated', 'esrb_rating': {'slug': 'adults-only'}},
+                {'id': 4, 'name': 'Mature', 'esrb_rating': {'slug': 'mature'}}
+            ],
+            'next': None
+        }
+        
+        response = client.get('/api/games/search', headers=auth_headers)
+        
+        assert [g['id'] for g in response.json['results']] == [1, 4]
+    
+    def test_filter_checks_tags_after_tagless_payload(self):
+        """Test that a tag-less payload does not decide the verdict for a later tagged one"""
+        from services.content_filter import ContentFilter
+        content_filter = ContentFilter(keywords=['xxx'], tags=['nsfw'], esrb_ratings=['adults-only'])
+        
+        assert not content_filter.is_blocked({'id': 5, 'name': 'Foo'})
+        assert content_filter.is_blocked({'id': 5, 'name': 'Foo', 'tags': [{'slug': 'nsfw'}]})
+        assert content_filter.is_blocked({'id': 5, 'name': 'Foo', 'esrb_rating': {'slug': 'adults-only'}})
+        assert not content_filter.is_blocked({'id': 5, 'name': 'Foo'})
+    
+    @patch('routes.games.RAWGService.search_games')
+    def test_played_ids_cache_follows_wishlist_changes(self, mock_search, client, auth_headers, app):
+        """Test that the cached played set follows wishlist changes"""
+        from services.played_games import PlayedGamesService
+        mock_search.side_effect = lambda **kwargs: {
+            'results': [{'id': 999, 'name': 'Played Game'}, {'id': 1000, 'name': 'Other Game'}],
+            'next': None
+        }
+        added = client.post('/api/wishlist', headers=auth_headers, json={
+            'rawg_id': 999, 'title': 'Played Game', 'status': 'played'
+        })
+        
+        searched = client.get('/api/games/search', headers=auth_headers)
+        assert [g['id'] for g in searched.json['results']] == [1000]
+        
+        with app.app_context(), patch('services.played_games.db.session.scalars') as mock_scalars:
+            assert 999 in PlayedGamesService.get(added.json['game']['user_id'])
+            mock_scalars.assert_not_called()
+        
+        client.patch(f"/api/wishlist/{added.json['game']['id']}", headers=auth_headers,
+                     json={'status': 'wishlist'})
+        with app.app_context():
+            assert 999 not in PlayedGamesService.get(added.json['game']['user_id'])
+        
+        searched = client.get('/api/games/search', headers=auth_headers)
+        assert [g['id'] for g in searched.json['results']] == [999, 1000]
+        
+        client.post('/api/wishlist', headers=auth_headers, json={
+            'rawg_id': 1000, 'title': 'Other Game', 'status': 'played'
+        })
+        searched = client.get('/api/games/search', headers=auth_headers)
+        assert [g['id'] for g in searched.json['results']] == [999]
+    
+    def test_played_ids_are_a_sorted_array(self):
+        """Test membership on the compact played set"""
+        from services.played_games import PlayedIds
+        played = PlayedIds([30, 10, 20, 10])
+        
+        assert list(played.ids) == [10, 20, 30]
+        assert 20 in played and 15 not in played and 5 not in played and 99 not in played
 
 class TestGameDetails:
     """Tests for game details endpoint"""
@@ -105,6 +191,170 @@ class TestGameDetails:
         assert response.json['name'] == 'Test Game'
         mock_details.assert_called_once_with(1)
 
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_batch_fetches_only_cache_misses(self, mock_request, client, auth_headers):
+        """Test that batch details reuse cached games and fetch the rest"""
+        mock_request.side_effect = lambda path, params=None, priority=None: {
+            'id': int(path.rsplit('/', 1)[1]), 'name': f'Game {path}'
+        }
+        client.get('/api/games/1', headers=auth_headers)
+        mock_request.reset_mock()
+        
+        response = client.get('/api/games/batch?ids=1,2,3,2', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert set(response.json['games']) == {'1', '2', '3'}
+        assert response.json['errors'] == {}
+        fetched = sorted(c.args[0] for c in mock_request.call_args_list)
+        assert fetched == ['/games/2', '/games/3']
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_batch_reports_per_id_errors(self, mock_request, client, auth_headers):
+        """Test that failed ids are reported without failing the batch"""
+        import requests
+        
+        def fetch(path, params=None, priority=None):
+            if path == '/games/2':
+                raise requests.HTTPError('404 Not Found')
+            return {'id': 1, 'name': 'Game 1'}
+        
+        mock_request.side_effect = fetch
+        response = client.get('/api/games/batch?ids=1,2', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert list(response.json['games']) == ['1']
+        assert '404' in response.json['errors']['2']
+    
+    def test_batch_validates_ids(self, client, auth_headers, app):
+        """Test batch id validation and the configured maximum"""
+        app.config['GAMES_BATCH_MAX_IDS'] = 2
+        
+        assert client.get('/api/games/batch', headers=auth_headers).status_code == 400
+        assert client.get('/api/games/batch?ids=1,abc', headers=auth_headers).status_code == 400
+        assert client.get('/api/games/batch?ids=1,2,3', headers=auth_headers).status_code == 400
+
+
+
+class TestFieldProjection:
+    """Tests for slim responses and the ?fields= parameter"""
+    
+    RAWG_GAME = {
+        'id': 1,
+        'name': 'Test Game',
+        'slug': 'test-game',
+        'rating': 4.5,
+        'released': '2024-01-01',
+        'background_image': 'https://example.com/image.jpg',
+        'genres': [{'id': 4, 'name': 'Action', 'slug': 'action', 'games_count': 1000, 'image_background': 'x'}],
+        'platforms': [{'platform': {'id': 4, 'name': 'PC', 'slug': 'pc', 'image': None}, 'requirements_en': {}}],
+        'stores': [{'store': {'id': 1}}],
+        'tags': [{'id': 31, 'name': 'Singleplayer'}],
+        'short_screenshots': [{'id': 1, 'image': 'x'}],
+        'ratings': [{'id': 5, 'title': 'exceptional'}],
+        'description': '<p>HTML</p>',
+        'description_raw': 'Plain text',
+        'developers': [{'id': 9, 'name': 'Studio', 'slug': 'studio', 'games_count': 3}]
+    }
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_search_returns_slim_cached_results(self, mock_request, client, auth_headers):
+        """Test that search results are projected before caching and on the wire"""
+        mock_request.return_value = {'count': 1, 'next': None, 'results': [dict(self.RAWG_GAME)],
+                                     'seo_title': 'x', 'filters': {}}
+        
+        response = client.get('/api/games/search', headers=auth_headers)
+        game = response.json['results'][0]
+        
+        assert response.status_code == 200
+        assert set(game) == {'id', 'name', 'slug', 'rating', 'released', 'background_image',
+                             'genres', 'platforms'}
+        assert game['genres'] == [{'id': 4, 'name': 'Action', 'slug': 'action'}]
+        assert game['platforms'] == [{'platform': {'id': 4, 'name': 'PC', 'slug': 'pc'}}]
+        assert 'seo_title' not in response.json
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_search_fields_parameter(self, mock_request, client, auth_headers):
+        """Test selecting specific fields for list results"""
+        mock_request.return_value = {'count': 1, 'next': None, 'results': [dict(self.RAWG_GAME)]}
+        
+        response = client.get('/api/games/search?fields=name,rating', headers=auth_headers)
+        
+        assert response.json['results'] == [{'id': 1, 'name': 'Test Game', 'rating': 4.5}]
+    
+    def test_unknown_fields_are_rejected(self, client, auth_headers):
+        """Test that fields outside the cached schema return 400"""
+        response = client.get('/api/games/search?fields=name,stores', headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert 'stores' in response.json['error']
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_details_drop_unrendered_payload(self, mock_request, client, auth_headers):
+        """Test that details keep rendered fields and drop large nested objects"""
+        mock_request.return_value = dict(self.RAWG_GAME)
+        
+        response = client.get('/api/games/1', headers=auth_headers)
+        
+        assert response.json['description_raw'] == 'Plain text'
+        assert response.json['developers'] == [{'id': 9, 'name': 'Studio', 'slug': 'studio'}]
+        for field in ('stores', 'tags', 'short_screenshots', 'ratings', 'description'):
+            assert field not in response.json
+
+
+class TestResponseCaching:
+    """Tests for pre-serialized, compressed responses with ETags"""
+    
+    GENRES = {'results': [{'id': i, 'name': f'Genre {i}', 'slug': f'genre-{i}'} for i in range(50)]}
+    
+    @patch('routes.games.RAWGService.get_genres')
+    def test_genres_served_with_etag_and_cache_control(self, mock_genres, client):
+        """Test validators and caching headers on taxonomy endpoints"""
+        mock_genres.return_value = self.GENRES
+        
+        response = client.get('/api/games/genres')
+        
+        assert response.status_code == 200
+        assert response.json == self.GENRES
+        assert response.headers['ETag']
+        assert 'public' in response.headers['Cache-Control']
+        assert 'max-age' in response.headers['Cache-Control']
+    
+    @patch('routes.games.RAWGService.get_genres')
+    def test_if_none_match_returns_304(self, mock_genres, client):
+        """Test conditional requests against the cached ETag"""
+        mock_genres.return_value = self.GENRES
+        etag = client.get('/api/games/genres').headers['ETag']
+        
+        response = client.get('/api/games/genres', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        # The serialized body is cached, so the lookup runs only once
+        mock_genres.assert_called_once()
+    
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_gzip_encoding(self, mock_platforms, client):
+        """Test that compressed bytes are served when accepted"""
+        import gzip, json
+        mock_platforms.return_value = self.GENRES
+        
+        response = client.get('/api/games/platforms', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(gzip.decompress(response.data)) == self.GENRES
+    
+    @patch('routes.games.RAWGService.get_game_details')
+    def test_details_are_private_and_errors_uncached(self, mock_details, client, auth_headers):
+        """Test that details are privately cacheable and error payloads are not stored"""
+        mock_details.side_effect = [{'error': 'boom'}, {'id': 1, 'name': 'Game'}]
+        
+        assert client.get('/api/games/1', headers=auth_headers).json == {'error': 'boom'}
+        response = client.get('/api/games/1', headers=auth_headers)
+        
+        assert response.json == {'id': 1, 'name': 'Game'}
+        assert 'private' in response.headers['Cache-Control']
 
 class TestRecommendations:
     """Tests for recommendations endpoint"""
@@ -156,3 +406,225 @@ class TestRecommendations:
         for game in response.json.get('preference_based', []):
             if 'rating' in game and game['rating'] is not None:
                 assert game['rating'] >= 3.0
+    
+    @staticmethod
+    def _setup_both_feeds(client, auth_headers, mock_genres, mock_platforms):
+        mock_genres.return_value = {'results': [
+            {'id': 1, 'name': 'Action', 'slug': 'action'},
+            {'id': 2, 'name': 'RPG', 'slug': 'role-playing-games-rpg'}
+        ]}
+        mock_platforms.return_value = {'results': [{'id': 4, 'name': 'PC'}]}
+        client.patch('/api/auth/preferences', headers=auth_headers, json={
+            'favorite_genres': ['Action'],
+            'favorite_platforms': ['PC']
+        })
+        client.post('/api/wishlist', headers=auth_headers, json={
+            'rawg_id': 50, 'title': 'Saved RPG', 'genres': ['RPG']
+        })
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_recommendation_searches_run_concurrently(self, mock_platforms, mock_genres,
+                                                      mock_search, client, auth_headers):
+        """Test that both candidate searches are in flight at the same time"""
+        import threading
+        self._setup_both_feeds(client, auth_headers, mock_genres, mock_platforms)
+        barrier = threading.Barrier(2, timeout=2)
+        
+        def search(**kwargs):
+            # Only passes if the other search is running concurrently
+            barrier.wait()
+            return {'results': [{'id': 7, 'name': 'Game', 'rating': 4.0,
+                                 'genres': [{'name': 'RPG'}]}]}
+        
+        mock_search.side_effect = search
+        response = client.get('/api/games/recommendations', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json['timed_out'] == []
+        assert [g['id'] for g in response.json['preference_based']] == [7]
+        assert [g['id'] for g in response.json['genre_based']] == [7]
+        genres_requested = {c.kwargs['genres'] for c in mock_search.call_args_list}
+        assert genres_requested == {'action', 'role-playing-games-rpg'}
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_recommendations_return_partial_feeds_on_timeout(self, mock_platforms, mock_genres,
+                                                            mock_search, client, auth_headers, app):
+        """Test that a slow branch is dropped once the deadline passes"""
+        import time
+        self._setup_both_feeds(client, auth_headers, mock_genres, mock_platforms)
+        
+        def search(**kwargs):
+            if kwargs['genres'] == 'role-playing-games-rpg':
+                time.sleep(1)
+            return {'results': [{'id': 7, 'name': 'Game', 'rating': 4.0,
+                                 'genres': [{'name': 'RPG'}]}]}
+        
+        mock_search.side_effect = search
+        app.config['RECOMMENDATION_DEADLINE'] = 0.3
+        response = client.get('/api/games/recommendations', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json['timed_out'] == ['genre_based']
+        assert response.json['genre_based'] == []
+        assert [g['id'] for g in response.json['preference_based']] == [7]
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_recommendations_are_cached_per_user(self, mock_platforms, mock_genres,
+                                                 mock_search, client, auth_headers):
+        """Test that a repeat visit is served from cache without recomputing"""
+        self._setup_both_feeds(client, auth_headers, mock_genres, mock_platforms)
+        mock_search.return_value = {'results': [{'id': 7, 'name': 'Game', 'rating': 4.0,
+                                                 'genres': [{'name': 'RPG'}]}]}
+        
+        first = client.get('/api/games/recommendations', headers=auth_headers)
+        calls = mock_search.call_count
+        second = client.get('/api/games/recommendations', headers=auth_headers)
+        
+        assert second.status_code == 200
+        assert second.json == first.json
+        assert mock_search.call_count == calls
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_recommendation_cache_invalidated_by_changes(self, mock_platforms, mock_genres,
+                                                         mock_search, client, auth_headers):
+        """Test that wishlist and preference changes drop the cached feeds"""
+        self._setup_both_feeds(client, auth_headers, mock_genres, mock_platforms)
+        mock_search.return_value = {'results': [{'id': 7, 'name': 'Game', 'rating': 4.0,
+                                                 'genres': [{'name': 'RPG'}]}]}
+        client.get('/api/games/recommendations', headers=auth_headers)
+        
+        client.post('/api/wishlist', headers=auth_headers, json={
+            'rawg_id': 7, 'title': 'Game', 'status': 'played', 'genres': ['RPG']
+        })
+        calls = mock_search.call_count
+        response = client.get('/api/games/recommendations', headers=auth_headers)
+        
+        assert mock_search.call_count > calls
+        assert response.json['preference_based'] == []
+        
+        client.patch('/api/auth/preferences', headers=auth_headers, json={'favorite_genres': []})
+        calls = mock_search.call_count
+        client.get('/api/games/recommendations', headers=auth_headers)
+        
+        assert mock_search.call_count > calls
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_partial_recommendations_are_not_cached(self, mock_platforms, mock_genres,
+                                                    mock_search, client, auth_headers, app):
+        """Test that feeds cut short by the deadline are recomputed next time"""
+        import time
+        self._setup_both_feeds(client, auth_headers, mock_genres, mock_platforms)
+        
+        def search(**kwargs):
+            if kwargs['genres'] == 'role-playing-games-rpg':
+                time.sleep(0.5)
+            return {'results': []}
+        
+        mock_search.side_effect = search
+        app.config['RECOMMENDATION_DEADLINE'] = 0.2
+        client.get('/api/games/recommendations', headers=auth_headers)
+        calls = mock_search.call_count
+        client.get('/api/games/recommendations', headers=auth_headers)
+        
+        assert mock_search.call_count > calls
+
+
+class TestPrecomputedRecommendations:
+    """Tests for the offline recommendation precomputation job"""
+    
+    @staticmethod
+    def _signup(client, name, genres):
+        response = client.post('/api/auth/signup', json={
+            'username': name,
+            'email': f'{name}@example.com',
+            'password': 'testpass123',
+            'favorite_genres': genres
+        })
+        return {'Authorization': f"Bearer {response.json['access_token']}"}
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_precompute_stores_rows_and_shares_searches(self, mock_platforms, mock_genres,
+                                                         mock_search, app, client, runner):
+        """Test that users with the same preferences share one RAWG search"""
+        from models import PrecomputedRecommendation
+        mock_genres.return_value = {'results': [{'id': 1, 'name': 'Action', 'slug': 'action'}]}
+        mock_platforms.return_value = {'results': []}
+        mock_search.return_value = {'results': [{'id': 7, 'name': 'Game', 'rating': 4.0}]}
+        for name in ('alice', 'bob', 'carol'):
+            self._signup(client, name, ['Action'])
+        
+        result = runner.invoke(args=['recommendations', 'precompute', '--chunk-size', '2'])
+        
+        assert result.exit_code == 0
+        assert 'Stored recommendations for 3 users' in result.output
+        assert mock_search.call_count == 1
+        with app.app_context():
+            rows = PrecomputedRecommendation.query.all()
+            assert len(rows) == 3
+            assert all(row.feeds['preference_based'][0]['id'] == 7 for row in rows)
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_endpoint_serves_fresh_precomputed_rows(self, mock_platforms, mock_genres,
+                                                    mock_search, client, runner):
+        """Test that the endpoint reads the stored feeds until the inputs change"""
+        mock_genres.return_value = {'results': [{'id': 1, 'name': 'Action', 'slug': 'action'}]}
+        mock_platforms.return_value = {'results': []}
+        mock_search.return_value = {'results': [{'id': 7, 'name': 'Game', 'rating': 4.0}]}
+        headers = self._signup(client, 'alice', ['Action'])
+        runner.invoke(args=['recommendations', 'precompute'])
+        calls = mock_search.call_count
+        
+        response = client.get('/api/games/recommendations', headers=headers)
+        
+        assert [g['id'] for g in response.json['preference_based']] == [7]
+        assert mock_search.call_count == calls
+        
+        client.post('/api/wishlist', headers=headers, json={'rawg_id': 7, 'title': 'Game', 'status': 'played'})
+        response = client.get('/api/games/recommendations', headers=headers)
+        
+        assert mock_search.call_count > calls
+        assert response.json['preference_based'] == []
+    
+    @patch('routes.games.RAWGService.search_games')
+    @patch('routes.games.RAWGService.get_genres')
+    @patch('routes.games.RAWGService.get_platforms')
+    def test_precomputed_rows_outlive_the_day_until_max_age(self, mock_platforms, mock_genres,
+                                                             mock_search, client, runner, app):
+        """Test that rows built before midnight are served the next day until they are too old"""
+        from datetime import date, datetime, timedelta
+        from models import db, PrecomputedRecommendation
+        from services.recommendation_service import RecommendationService
+        mock_genres.return_value = {'results': [{'id': 1, 'name': 'Action', 'slug': 'action'}]}
+        mock_platforms.return_value = {'results': []}
+        mock_search.return_value = {'results': [{'id': 7, 'name': 'Game', 'rating': 4.0}]}
+        headers = self._signup(client, 'alice', ['Action'])
+        runner.invoke(args=['recommendations', 'precompute'])
+        calls = mock_search.call_count
+        
+        tomorrow = date.today() + timedelta(days=1)
+        with patch('services.recommendation_service.RAWGService._today_bucket', return_value=tomorrow):
+            client.get('/api/games/recommendations', headers=headers)
+            assert mock_search.call_count == calls
+            
+            with app.app_context():
+                row = PrecomputedRecommendation.query.one()
+                max_age = app.config['RECOMMENDATION_PRECOMPUTE_MAX_AGE']
+                row.generated_at = datetime.utcnow() - timedelta(seconds=max_age + 1)
+                db.session.commit()
+                RecommendationService.invalidate(row.user_id)
+            client.get('/api/games/recommendations', headers=headers)
+            assert mock_search.call_count > calls
@@ -0,0 +1,78 @@
+"""
+Tests for the database migrations
+"""
+import sqlalchemy as sa
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+from app import create_app
+from models import db, Game
+from tests.conftest import TestConfig
+
+
+def make_app(tmp_path):
+    class MigrationConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'migrations.db'}"
+    return create_app(MigrationConfig)
+
+
+class TestMigrations:
+    """Tests for the Alembic revisions"""
+    
+    def test_upgrade_matches_models(self, tmp_path):
+        """Test that migrating an empty database produces the models' schema"""
+        app = make_app(tmp_path)
+        with app.app_context():
+            upgrade()
+            with db.engine.connect() as connection:
+                diff = compare_metadata(MigrationContext.configure(connection), db.metadata)
+            
+            assert diff == []
+    
+    def test_baseline_adopts_create_all_database(self, tmp_path):
+        """Test that a database built by create_all() before migrations upgrades cleanly"""
+        app = make_app(tmp_path)
+        with app.app_context():
+            upgrade()
+            downgrade(revision='0001')
+            db.session.execute(sa.text('DELETE FROM alembic_version'))
+            db.session.commit()
+            
+            upgrade()
+            
+            indexes = {index['name'] for index in sa.inspect(db.engine).get_indexes('games')}
+            assert indexes == {index.name for index in Game.__table__.indexes}
+    
+    def test_upgrade_removes_duplicate_saves(self, tmp_path):
+        """Test that duplicate (user_id, rawg_id) rows collapse to the newest one"""
+        app = make_app(tmp_path)
+        with app.app_context():
+            upgrade(revision='0001')
+            db.session.execute(sa.text(
+                "INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'a', 'a@x', 'x')"
+            ))
+            db.session.execute(sa.text(
+                "INSERT INTO games (user_id, rawg_id, title, status) VALUES "
+                "(1, 5, 'Old', 'wishlist'), (1, 5, 'New', 'played'), (1, 6, 'Other', 'wishlist')"
+            ))
+            db.session.commit()
+            
+            upgrade()
+            
+            rows = db.session.execute(sa.text('SELECT rawg_id, status FROM games ORDER BY rawg_id')).all()
+            assert [tuple(row) for row in rows] == [(5, 'played'), (6, 'wishlist')]
+    
+    def test_upgrade_indexes_catalog_names(self, tmp_path):
+        """Test that the word index is filled from games already in the catalog"""
+        app = make_app(tmp_path)
+        with app.app_context():
+            upgrade(revision='0005')
+            db.session.execute(sa.text(
+                "INSERT INTO catalog_games (rawg_id, name) VALUES (1, 'Dragon Quest XI'), (2, 'Farm Life')"
+            ))
+            db.session.commit()
+            
+            upgrade()
+            
+            rows = db.session.execute(sa.text('SELECT rawg_id, word FROM catalog_game_words ORDER BY rawg_id, word')).all()
+            assert [tuple(row) for row in rows] == [(1, 'dragon'), (1, 'quest'), (1, 'xi'), (2, 'farm'), (2, 'life')]
@@ -0,0 +1,531 @@
+"""
+Tests for the RAWG service layer
+"""
+import pytest
+import requests
+import threading
+import time
+from datetime import date
+from unittest.mock import patch, MagicMock
+from services.rawg_service import RAWGService
+from services.single_flight import SingleFlight
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class TestRAWGSession:
+    """Tests for the pooled RAWG HTTP session"""
+    
+    def test_session_is_reused(self, app):
+        """Test that every call shares one pooled session per process"""
+        with app.app_context():
+            assert RAWGService._get_session() is RAWGService._get_session()
+    
+    def test_session_retry_configuration(self, app):
+        """Test that the adapter retries transient failures with backoff"""
+        with app.app_context():
+            adapter = RAWGService._get_session().get_adapter('https://api.rawg.io/api')
+            retry = adapter.max_retries
+            
+            assert retry.total == app.config['RAWG_MAX_RETRIES']
+            assert retry.backoff_factor == app.config['RAWG_BACKOFF_FACTOR']
+            assert retry.respect_retry_after_header is True
+            assert 503 in retry.status_forcelist
+            assert 429 in retry.status_forcelist
+    
+    def test_retry_after_is_capped(self, app):
+        """Test that a long Retry-After is capped at the backoff maximum"""
+        from urllib3 import HTTPResponse
+        with app.app_context():
+            retry = RAWGService._get_session().get_adapter('https://api.rawg.io/api').max_retries
+        response = HTTPResponse(status=429, headers={'Retry-After': '3600'})
+        
+        assert retry.get_retry_after(response) == retry.backoff_max == app.config['RAWG_TIMEOUT']
+    
+    def test_retries_stop_at_call_deadline(self, app):
+        """Test that no retry starts once a whole attempt would overrun the call's budget"""
+        from urllib3 import HTTPResponse
+        from urllib3.exceptions import MaxRetryError
+        from services.rawg_service import _retry_cutoff
+        with app.app_context():
+            retry = RAWGService._get_session().get_adapter('https://api.rawg.io/api').max_retries
+        response = HTTPResponse(status=503, headers={'Retry-After': '5'})
+        
+        assert retry.increment('GET', '/games', response=response).total == retry.total - 1
+        token = _retry_cutoff.set(time.monotonic() + 1)
+        try:
+            with pytest.raises(MaxRetryError):
+                retry.increment('GET', '/games', response=response)
+        finally:
+            _retry_cutoff.reset(token)
+    
+    @patch('services.rawg_service.RAWGService._get_session')
+    def test_all_methods_use_session(self, mock_get_session, app):
+        """Test that RAWG calls go through the shared session"""
+        response = MagicMock()
+        response.json.return_value = {'results': [{'id': 1, 'name': 'Game'}]}
+        mock_get_session.return_value.get.return_value = response
+        
+        with app.app_context():
+            RAWGService.search_games(search='zelda')
+            RAWGService.get_genres()
+        
+        urls = [call.args[0] for call in mock_get_session.return_value.get.call_args_list]
+        assert urls[0].endswith('/games')
+        assert urls[1].endswith('/genres')
+        params = mock_get_session.return_value.get.call_args_list[0].kwargs['params']
+        assert params['key'] == app.config['RAWG_API_KEY']
+        assert params['search'] == 'zelda'
+
+
+class TestSearchCache:
+    """Tests for the search_games result cache"""
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_equivalent_searches_share_cache_entry(self, mock_request, app):
+        """Test that normalized parameters hit the same cache entry"""
+        mock_request.return_value = {'results': [{'id': 1, 'name': 'Game'}]}
+        
+        with app.app_context():
+            first = RAWGService.search_games(genres='rpg,action', platforms='187,4', search='  Zelda ')
+            second = RAWGService.search_games(genres='Action, rpg', platforms='4,187', search='zelda')
+        
+        assert first == second
+        mock_request.assert_called_once()
+        params = mock_request.call_args.args[1]
+        assert params['genres'] == 'action,rpg'
+        assert params['platforms'] == '4,187'
+        assert params['search'] == 'zelda'
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_different_pages_are_cached_separately(self, mock_request, app):
+        """Test that pagination is part of the cache key"""
+        mock_request.return_value = {'results': []}
+        
+        with app.app_context():
+            RAWGService.search_games(page=1)
+            RAWGService.search_games(page=2)
+        
+        assert mock_request.call_count == 2
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_errors_are_not_cached(self, mock_request, app):
+        """Test that failed searches are retried on the next call"""
+        mock_request.side_effect = [requests.ConnectionError('boom'), {'results': []}]
+        
+        with app.app_context():
+            assert 'error' in RAWGService.search_games()
+            assert RAWGService.search_games() == {'results': []}
+        
+        assert mock_request.call_count == 2
+    
+    def test_release_dates_use_day_bucket(self):
+        """Test that the dates window is derived from the day bucket"""
+        today = date(2024, 6, 1)
+        
+        assert RAWGService._release_dates('upcoming', today) == '2024-06-01,2025-06-01'
+        assert RAWGService._release_dates('current', today) == '2023-12-04,2024-06-01'
+        assert RAWGService._release_dates('both', today) == '2022-06-02,2025-06-01'
+
+
+class TestSingleFlight:
+    """Tests for request coalescing"""
+    
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent callers for one key run the function once"""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+        
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return {'results': [1, 2]}
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do('key', fetch)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while flight.stats()['coalesced'] < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert len(calls) == 1
+        assert results == [{'results': [1, 2]}] * 5
+        assert flight.stats() == {'executed': 1, 'coalesced': 4, 'in_flight': 0}
+        # Each caller gets its own copy it can safely mutate
+        assert len({id(result) for result in results}) == 5
+    
+    def test_errors_propagate_to_waiters(self):
+        """Test that a failed call raises for every waiting caller"""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+        
+        def fetch():
+            release.wait(2)
+            raise requests.ConnectionError('boom')
+        
+        def caller():
+            try:
+                flight.do('key', fetch)
+            except requests.ConnectionError as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while flight.stats()['coalesced'] < 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert len(errors) == 3
+    
+    def test_sequential_calls_are_not_coalesced(self):
+        """Test that a finished call does not serve later callers"""
+        flight = SingleFlight()
+        
+        assert flight.do('key', lambda: 1) == 1
+        assert flight.do('key', lambda: 2) == 2
+        assert flight.stats()['coalesced'] == 0
+    
+    @patch('services.rawg_service.RAWGService._fetch')
+    def test_concurrent_detail_misses_coalesce(self, mock_fetch, app):
+        """Test that concurrent cache misses send one RAWG request"""
+        release = threading.Event()
+        
+        def fetch(path, params=None):
+            release.wait(2)
+            return {'id': 7, 'name': 'Game'}
+        
+        mock_fetch.side_effect = fetch
+        before = RAWGService.get_stats()['single_flight']['coalesced']
+        
+        def caller():
+            with app.app_context():
+                RAWGService.get_game_details(7)
+        
+        threads = [threading.Thread(target=caller) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while RAWGService.get_stats()['single_flight']['coalesced'] - before < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        mock_fetch.assert_called_once()
+
+
+class TestStaleWhileRevalidate:
+    """Tests for stale-while-revalidate memoization"""
+    
+    @staticmethod
+    def _expire(key):
+        from services.rawg_service import cache
+        entry = cache.get(key)
+        entry['fresh_until'] = 0
+        cache.set(key, entry)
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_fresh_entry_is_served_from_cache(self, mock_request, app):
+        """Test that fresh entries do not hit RAWG"""
+        mock_request.return_value = {'results': [{'id': 1, 'name': 'Action'}]}
+        
+        with app.app_context():
+            RAWGService.get_genres()
+            RAWGService.get_genres()
+        
+        mock_request.assert_called_once()
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_stale_entry_served_while_refreshing(self, mock_request, app):
+        """Test that a stale entry is returned immediately and refreshed in the background"""
+        refreshed = threading.Event()
+        
+        def fetch(path, params=None, priority=None):
+            if mock_request.call_count > 1:
+                refreshed.set()
+                return {'id': 5, 'name': 'New Name'}
+            return {'id': 5, 'name': 'Old Name'}
+        
+        mock_request.side_effect = fetch
+        
+        with app.app_context():
+            RAWGService.get_game_details(5)
+            self._expire('rawg:get_game_details:5')
+            
+            assert RAWGService.get_game_details(5)['name'] == 'Old Name'
+            assert refreshed.wait(2)
+            deadline = time.time() + 2
+            while RAWGService.get_game_details(5)['name'] != 'New Name' and time.time() < deadline:
+                time.sleep(0.01)
+            assert RAWGService.get_game_details(5)['name'] == 'New Name'
+        
+        assert mock_request.call_count == 2
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_stale_entry_blocks_when_disabled(self, mock_request, app):
+        """Test that stale entries are refetched synchronously when SWR is off"""
+        mock_request.side_effect = [{'results': ['old']}, {'results': ['new']}]
+        app.config['RAWG_SWR_ENABLED'] = False
+        
+        with app.app_context():
+            RAWGService.get_platforms()
+            self._expire('rawg:get_platforms')
+            
+            assert RAWGService.get_platforms() == {'results': ['new']}
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_error_results_use_short_negative_ttl(self, mock_request, app):
+        """Test that RAWG failures are cached only for the negative-cache TTL"""
+        mock_request.side_effect = [requests.ConnectionError('boom'), {'results': []}]
+        
+        with app.app_context():
+            assert 'error' in RAWGService.get_game_screenshots(9)
+            assert 'error' in RAWGService.get_game_screenshots(9)
+            assert mock_request.call_count == 1
+            
+            self._expire('rawg:get_game_screenshots:9')
+            assert RAWGService.get_game_screenshots(9) == {'results': []}
+    
+    @patch('services.rawg_service.RAWGService._request')
+    def test_last_known_good_served_on_error(self, mock_request, app):
+        """Test that an expired good entry is served when RAWG fails"""
+        mock_request.side_effect = [{'id': 3, 'name': 'Game'}, requests.ConnectionError('boom')]
+        app.config['RAWG_SWR_ENABLED'] = False
+        
+        with app.app_context():
+            RAWGService.get_game_details(3)
+            self._expire('rawg:get_game_details:3')
+            
+            assert RAWGService.get_game_details(3) == {'id': 3, 'name': 'Game'}
+
+
+class TestTieredCache:
+    """Tests for the L1/L2 tiered cache backend"""
+    
+    @staticmethod
+    def _worker_cache(cache_dir):
+        from flask_caching.backends import FileSystemCache
+        from services.tiered_cache import TieredCache
+        return TieredCache(FileSystemCache(str(cache_dir)), l1_threshold=10, l1_timeout=60)
+    
+    def test_workers_share_l2(self, tmp_path):
+        """Test that a value stored by one worker is visible to another"""
+        worker_a = self._worker_cache(tmp_path)
+        worker_b = self._worker_cache(tmp_path)
+        
+        worker_a.set('rawg:get_genres', {'results': ['action']}, timeout=300)
+        
+        assert worker_b.l1.get('rawg:get_genres') is None
+        assert worker_b.get('rawg:get_genres') == {'results': ['action']}
+        # The L2 hit is promoted into the reading worker's L1
+        assert worker_b.l1.get('rawg:get_genres') == {'results': ['action']}
+    
+    def test_l1_serves_without_l2(self, tmp_path):
+        """Test that L1 hits do not touch L2"""
+        cache = self._worker_cache(tmp_path)
+        cache.set('key', 'value', timeout=300)
+        cache.l2.clear()
+        
+        assert cache.get('key') == 'value'
+    
+    def test_delete_removes_both_tiers(self, tmp_path):
+        """Test that deletes clear L1 and L2"""
+        cache = self._worker_cache(tmp_path)
+        cache.set('key', 'value', timeout=300)
+        cache.delete('key')
+        
+        assert cache.get('key') is None
+    
+    def test_factory_builds_configured_l2(self, tmp_path):
+        """Test that flask_caching builds the tiered backend from config"""
+        from flask import Flask
+        from flask_caching import Cache
+        from flask_caching.backends import FileSystemCache
+        from services.tiered_cache import TieredCache
+        
+        flask_app = Flask(__name__)
+        tiered = Cache()
+        tiered.init_app(flask_app, config={
+            'CACHE_TYPE': 'services.tiered_cache.TieredCache',
+            'CACHE_L2_TYPE': 'FileSystemCache',
+            'CACHE_DIR': str(tmp_path)
+        })
+        
+        with flask_app.app_context():
+            assert isinstance(tiered.cache, TieredCache)
+            assert isinstance(tiered.cache.l2, FileSystemCache)
+            tiered.set('key', 'value')
+            assert tiered.get('key') == 'value'
+
+
+class TestCircuitBreaker:
+    """Tests for the RAWG circuit breaker"""
+    
+    @staticmethod
+    def _fail():
+        raise requests.ConnectionError('boom')
+    
+    def test_opens_after_failure_rate_reached(self):
+        """Test that the circuit opens and fails fast once the failure rate is reached"""
+        breaker = CircuitBreaker(window_size=4, failure_rate=0.5, min_calls=4, reset_timeout=60)
+        
+        breaker.call(lambda: 'ok')
+        breaker.call(lambda: 'ok')
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                breaker.call(self._fail)
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        called = []
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: called.append(1))
+        assert called == []
+    
+    def test_half_open_trial_closes_circuit(self):
+        """Test that a successful trial call after the reset timeout closes the circuit"""
+        breaker = CircuitBreaker(window_size=2, failure_rate=0.5, min_calls=2, reset_timeout=0.05)
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                breaker.call(self._fail)
+        
+        time.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.call(lambda: 'ok') == 'ok'
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_client_errors_do_not_count(self):
+        """Test that exceptions classified as non-failures keep the circuit closed"""
+        breaker = CircuitBreaker(window_size=2, failure_rate=0.5, min_calls=2)
+        for _ in range(3):
+            with pytest.raises(requests.ConnectionError):
+                breaker.call(self._fail, is_failure=lambda e: False)
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    @patch('services.rawg_service.RAWGService._fetch')
+    def test_open_circuit_fast_fails_rawg_calls(self, mock_fetch, app):
+        """Test that RAWGService stops calling RAWG while the circuit is open"""
+        mock_fetch.side_effect = requests.ConnectionError('boom')
+        app.config['RAWG_BREAKER_MIN_CALLS'] = 2
+        app.config['RAWG_ERROR_CACHE_TIMEOUT'] = 0
+        
+        with app.app_context():
+            for game_id in range(4):
+                assert 'error' in RAWGService.get_game_details(game_id)
+            
+            assert mock_fetch.call_count == 2
+            assert RAWGService.get_stats()['circuit_breaker']['state'] == CircuitBreaker.OPEN
+
+
+class TestRateLimiter:
+    """Tests for the shared outbound token bucket"""
+    
+    def test_buckets_share_state_across_processes(self, tmp_path):
+        """Test that two limiter instances on one file draw from one budget"""
+        from services.rate_limiter import TokenBucket, PRIORITY_INTERACTIVE
+        path = str(tmp_path / 'bucket.sqlite3')
+        worker_a = TokenBucket(path, rate=0.001, burst=2)
+        worker_b = TokenBucket(path, rate=0.001, burst=2)
+        
+        assert worker_a.try_acquire(PRIORITY_INTERACTIVE)[0] is True
+        assert worker_b.try_acquire(PRIORITY_INTERACTIVE)[0] is True
+        assert worker_a.try_acquire(PRIORITY_INTERACTIVE)[0] is False
+    
+    def test_interactive_calls_use_reserved_headroom(self, tmp_path):
+        """Test that bulk work cannot drain the tokens reserved for interactive calls"""
+        from services.rate_limiter import TokenBucket, PRIORITY_BULK, PRIORITY_INTERACTIVE
+        bucket = TokenBucket(str(tmp_path / 'bucket.sqlite3'), rate=0.001, burst=4)
+        
+        assert bucket.try_acquire(PRIORITY_BULK)[0] is True
+        assert bucket.try_acquire(PRIORITY_BULK)[0] is True
+        assert bucket.try_acquire(PRIORITY_BULK)[0] is False
+        assert bucket.try_acquire(PRIORITY_INTERACTIVE)[0] is True
+        assert bucket.try_acquire(PRIORITY_INTERACTIVE)[0] is True
+    
+    def test_low_priority_is_shed_after_deadline(self, tmp_path):
+        """Test that calls queue until the deadline and are then shed"""
+        from services.rate_limiter import TokenBucket, RateLimitExceeded, PRIORITY_DEFAULT
+        bucket = TokenBucket(str(tmp_path / 'bucket.sqlite3'), rate=20, burst=1)
+        bucket.acquire(PRIORITY_DEFAULT)
+        
+        # Refills in ~50ms, so a short queue succeeds
+        bucket.acquire(PRIORITY_DEFAULT, max_wait=0.5)
+        with pytest.raises(RateLimitExceeded):
+            bucket.acquire(PRIORITY_DEFAULT, max_wait=0)
+        
+        assert bucket.stats() == {'acquired': 2, 'waited': 1, 'shed': 1}
+    
+    @patch('services.rawg_service.RAWGService._fetch')
+    def test_rawg_calls_are_rate_limited(self, mock_fetch, app, tmp_path):
+        """Test that RAWGService sheds calls once the bucket is empty"""
+        mock_fetch.return_value = {'results': []}
+        app.config.update(
+            RAWG_RATE_LIMIT=0.001,
+            RAWG_RATE_BURST=1,
+            RAWG_RATE_LIMIT_DB=str(tmp_path / 'bucket.sqlite3'),
+            RAWG_RATE_MAX_WAIT_DEFAULT=0
+        )
+        
+        with app.app_context():
+            assert RAWGService.search_games(page=1) == {'results': []}
+            assert 'rate limit' in RAWGService.search_games(page=2)['error']
+        
+        mock_fetch.assert_called_once()
+
+
+class TestTaxonomy:
+    """Tests for the genre/platform lookup indexes"""
+    
+    GENRES = {'results': [
+        {'id': 4, 'name': 'Action', 'slug': 'action'},
+        {'id': 5, 'name': 'RPG', 'slug': 'role-playing-games-rpg'}
+    ]}
+    PLATFORMS = {'results': [
+        {'id': 4, 'name': 'PC', 'slug': 'pc'},
+        {'id': 187, 'name': 'PlayStation 5', 'slug': 'playstation5'}
+    ]}
+    
+    def test_index_resolves_names_slugs_ids_and_aliases(self):
+        """Test case-folded resolution from every known form"""
+        from services.taxonomy import TaxonomyIndex, PLATFORM_ALIASES
+        index = TaxonomyIndex(self.PLATFORMS['results'], key='id', aliases=PLATFORM_ALIASES)
+        
+        assert index.resolve('PlayStation 5') == '187'
+        assert index.resolve('playstation5') == '187'
+        assert index.resolve(' PS5 ') == '187'
+        assert index.resolve('187') == '187'
+        assert index.resolve('Dreamcast') is None
+        assert index.resolve_many(['pc', 'PC', 'Windows', 'ps5', 'unknown']) == ['4', '187']
+    
+    @patch('services.rawg_service.RAWGService.get_genres')
+    def test_index_built_once_per_payload(self, mock_genres, app):
+        """Test that the index is kept in memory instead of rebuilt per call"""
+        from services.taxonomy import TaxonomyService
+        mock_genres.return_value = self.GENRES
+        
+        with app.app_context():
+            assert TaxonomyService.genres().resolve_many(['Action', 'rpg']) == ['action', 'role-playing-games-rpg']
+            first = TaxonomyService.genres()
+            assert TaxonomyService.genres() is first
+        
+        mock_genres.assert_called_once()
+    
+    @patch('services.rawg_service.RAWGService.get_platforms')
+    def test_index_refreshes_after_ttl(self, mock_platforms, app):
+        """Test that the index follows the underlying data once it expires"""
+        from services.taxonomy import TaxonomyService
+        mock_platforms.side_effect = [{'results': []}, self.PLATFORMS]
+        app.config['TAXONOMY_INDEX_TTL'] = 0
+        
+        with app.app_context():
+            assert TaxonomyService.platforms().resolve_many(['PC']) == []
+            assert TaxonomyService.platforms().resolve_many(['PC']) == ['4']
@@ -0,0 +1,76 @@
+"""
+Tests for recommendation candidate scoring
+"""
+import random
+from datetime import date
+from services.scoring import Candidates
+
+TODAY = date(2026, 1, 1)
+
+
+def make_game(game_id, rating, genres=(), platforms=(), released='2025-06-01'):
+    return {
+        'id': game_id,
+        'name': f'Game {game_id}',
+        'rating': rating,
+        'released': released,
+        'genres': [{'name': name} for name in genres],
+        'platforms': [{'platform': {'name': name}} for name in platforms]
+    }
+
+
+class TestCandidates:
+    """Tests for vectorized candidate scoring"""
+    
+    def test_genre_and_platform_fit_outrank_rating(self):
+        """Test that a matching game beats a slightly better rated unrelated one"""
+        pool = Candidates([
+            make_game(1, 4.6, genres=['Puzzle'], platforms=['Xbox']),
+            make_game(2, 4.2, genres=['RPG'], platforms=['PC'])
+        ], today=TODAY)
+        
+        ranked = pool.top_k(2, {'rpg': 1.0}, {'pc': 1.0})
+        
+        assert [game['id'] for game in ranked] == [2, 1]
+    
+    def test_rating_floor_and_genre_requirement(self):
+        """Test that floors drop games before ranking"""
+        pool = Candidates([
+            make_game(1, 3.4, genres=['RPG']),
+            make_game(2, 4.8, genres=['Puzzle']),
+            make_game(3, 3.9, genres=['RPG', 'Action'])
+        ], today=TODAY)
+        
+        assert [g['id'] for g in pool.top_k(5, {'rpg': 1.0}, min_rating=3.5)] == [3, 2]
+        assert [g['id'] for g in pool.top_k(5, {'rpg': 1.0}, min_rating=3.5, require_genre=True)] == [3]
+    
+    def test_recency_prefers_newer_releases(self):
+        """Test that equal games are ordered by release date, unknown dates last"""
+        pool = Candidates([
+            make_game(1, 4.0, released='2010-01-01'),
+            make_game(2, 4.0, released=None),
+            make_game(3, 4.0, released='2025-12-01')
+        ], today=TODAY)
+        
+        assert [game['id'] for game in pool.top_k(3)] == [3, 1, 2]
+    
+    def test_top_k_matches_full_sort(self):
+        """Test that argpartition top-k agrees with sorting every score"""
+        rng = random.Random(7)
+        genres = ['Action', 'RPG', 'Puzzle', 'Shooter', 'Indie']
+        games = [
+            make_game(i, round(rng.uniform(0, 5), 2), genres=rng.sample(genres, 2), platforms=['PC'])
+            for i in range(500)
+        ]
+        pool = Candidates(games, today=TODAY)
+        profile = {'rpg': 1.0, 'indie': 0.5}
+        
+        scores, _ = pool.scores(profile, {'pc': 1.0})
+        expected = sorted(range(500), key=lambda i: -scores[i])[:20]
+        ranked = pool.top_k(20, profile, {'pc': 1.0})
+        
+        assert [game['id'] for game in ranked] == [games[i]['id'] for i in expected]
+    
+    def test_empty_pool(self):
+        """Test that an empty pool ranks to nothing"""
+        assert Candidates([]).top_k(10, {'rpg': 1.0}) == []
@@ -0,0 +1,133 @@
+"""
+Tests for item-to-item collaborative filtering
+"""
+from unittest.mock import patch
+from models import db, CollectionVersion, Game, GameSimilarity, User
+from services.similarity_service import SimilarityService
+
+
+def save_games(username, games):
+    """Create a user with saved (rawg_id, status) games"""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        user = User(username=username, email=f'{username}@example.com')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.flush()
+    for rawg_id, status in games:
+        db.session.add(Game(user_id=user.id, rawg_id=rawg_id, title=f'Game {rawg_id}', status=status))
+    CollectionVersion.bump(user.id)
+    db.session.commit()
+    return user
+
+
+class TestSimilarityService:
+    """Tests for building and reading game similarities"""
+    
+    def test_full_rebuild_and_recommend(self, app):
+        """Test that co-saved games are recommended, played weighing more"""
+        with app.app_context():
+            save_games('alice', [(1, 'played'), (2, 'played')])
+            save_games('bob', [(1, 'wishlist'), (3, 'wishlist')])
+            save_games('carol', [(3, 'wishlist'), (4, 'wishlist')])
+            dave = save_games('dave', [(1, 'wishlist')])
+            
+            result = SimilarityService.rebuild(full=True)
+            recommended = SimilarityService.recommend(dave.id, 10)
+            
+            assert result['full'] is True
+            assert result['games'] == 4
+            assert [game['id'] for game in recommended] == [2, 3]
+            assert recommended[0]['name'] == 'Game 2'
+    
+    def test_recommend_skips_blocked_games(self, app):
+        """Test that the skip predicate drops games"""
+        with app.app_context():
+            save_games('alice', [(1, 'played'), (2, 'played'), (3, 'wishlist')])
+            dave = save_games('dave', [(1, 'wishlist')])
+            SimilarityService.rebuild(full=True)
+            
+            recommended = SimilarityService.recommend(dave.id, 10, skip=lambda game: game['id'] == 2)
+            
+            assert [game['id'] for game in recommended] == [3]
+    
+    def test_incremental_rebuild_only_touches_changed_collections(self, app):
+        """Test that an incremental run recomputes games of changed users only"""
+        with app.app_context():
+            save_games('alice', [(1, 'played'), (2, 'played')])
+            save_games('bob', [(5, 'wishlist'), (6, 'wishlist')])
+            SimilarityService.rebuild()
+            
+            save_games('alice', [(3, 'wishlist')])
+            result = SimilarityService.rebuild()
+            
+            assert result['full'] is False
+            assert result['games'] == 3
+            pairs = {(s.rawg_id, s.similar_rawg_id) for s in GameSimilarity.query.all()}
+            assert (1, 3) in pairs and (3, 2) in pairs
+            assert (5, 6) in pairs
+    
+    def test_incremental_rebuild_drops_pairs_of_removed_games(self, app):
+        """Test that removing a game recomputes its own list, matching a full rebuild"""
+        with app.app_context():
+            alice = save_games('alice', [(1, 'wishlist'), (2, 'wishlist')])
+            save_games('bob', [(1, 'wishlist'), (3, 'wishlist')])
+            save_games('carol', [(2, 'wishlist')])
+            SimilarityService.rebuild(full=True)
+            
+            Game.query.filter_by(user_id=alice.id, rawg_id=1).delete()
+            CollectionVersion.bump(alice.id)
+            db.session.commit()
+            SimilarityService.rebuild()
+            incremental = {(s.rawg_id, s.similar_rawg_id) for s in GameSimilarity.query.all()}
+            SimilarityService.rebuild(full=True)
+            
+            assert (1, 2) not in incremental
+            assert incremental == {(s.rawg_id, s.similar_rawg_id) for s in GameSimilarity.query.all()}
+    
+    def test_incremental_rebuild_drops_pairs_when_both_games_are_removed(self, app):
+        """Test that a pair only one user co-saved goes once they remove both games"""
+        with app.app_context():
+            alice = save_games('alice', [(1, 'wishlist'), (2, 'wishlist')])
+            save_games('bob', [(1, 'wishlist'), (3, 'wishlist')])
+            save_games('carol', [(2, 'wishlist'), (3, 'wishlist')])
+            SimilarityService.rebuild(full=True)
+            
+            Game.query.filter_by(user_id=alice.id).delete()
+            CollectionVersion.bump(alice.id)
+            db.session.commit()
+            SimilarityService.rebuild()
+            
+            pairs = {(s.rawg_id, s.similar_rawg_id) for s in GameSimilarity.query.all()}
+            assert pairs == {(1, 3), (3, 1), (2, 3), (3, 2)}
+    
+    def test_incremental_rebuild_drops_unsaved_games(self, app):
+        """Test that games nobody saves any more lose their similarity rows"""
+        with app.app_context():
+            alice = save_games('alice', [(1, 'played'), (2, 'played')])
+            SimilarityService.rebuild()
+            
+            Game.query.filter_by(user_id=alice.id, rawg_id=2).delete()
+            CollectionVersion.bump(alice.id)
+            db.session.commit()
+            SimilarityService.rebuild()
+            
+            assert GameSimilarity.query.count() == 0
+
+
+class TestCollaborativeFeed:
+    """Tests for the collaborative recommendation feed"""
+    
+    @patch('routes.games.RAWGService.search_games')
+    def test_recommendations_include_collaborative_feed(self, mock_search, app, client, auth_headers, runner):
+        """Test that the feed comes from stored similarities"""
+        mock_search.return_value = {'results': []}
+        client.post('/api/wishlist', headers=auth_headers, json={'rawg_id': 1, 'title': 'Game 1'})
+        with app.app_context():
+            save_games('alice', [(1, 'played'), (2, 'played')])
+        
+        result = runner.invoke(args=['recommendations', 'similarities'])
+        response = client.get('/api/games/recommendations', headers=auth_headers)
+        
+        assert 'Stored 2 similar games for 2 games (full)' in result.output
+        assert [game['id'] for game in response.json['collaborative']] == [2]
@@ -1,6 +1,7 @@
 """
 Tests for wishlist/collection routes
 """
+import re
 import pytest
 from models import db, Game
 
@@ -121,6 +122,28 @@ class TestWishlistAdd:
         )
         
         assert response.status_code == 400
+    
+    def test_concurrent_duplicate_add_updates_existing(self, client, auth_headers, app):
+        """Test that losing an insert race on (user_id, rawg_id) updates the winner's row"""
+        from unittest.mock import patch
+        from routes.wishlist import find_saved_game
+        client.post('/api/wishlist', headers=auth_headers, json={'rawg_id': 123, 'title': 'Test Game'})
+        calls = []
+        
+        def racing_lookup(user_id, rawg_id):
+            # The first lookup misses, as if the other request had not committed yet
+            calls.append(rawg_id)
+            return None if len(calls) == 1 else find_saved_game(user_id, rawg_id)
+        
+        with patch('routes.wishlist.find_saved_game', side_effect=racing_lookup):
+            response = client.post('/api/wishlist', headers=auth_headers, json={
+                'rawg_id': 123, 'title': 'Test Game', 'status': 'played'
+            })
+        
+        assert response.status_code == 200
+        assert response.json['game']['status'] == 'played'
+        with app.app_context():
+            assert Game.query.filter_by(rawg_id=123).count() == 1
 
 
 class TestWishlistUpdate:
@@ -236,3 +259,338 @@ class TestWishlistCheck:
         assert response.status_code == 200
         assert response.json['in_wishlist'] is False
         assert response.json['game'] is None
+
+
+class TestWishlistConditionalGet:
+    """Tests for collection versioning and conditional GETs"""
+    
+    def test_unchanged_collection_returns_304(self, client, auth_headers):
+        """Test that a matching ETag returns 304 without a body"""
+        client.post('/api/wishlist', headers=auth_headers, json={'rawg_id': 1, 'title': 'Game 1'})
+        etag = client.get('/api/wishlist', headers=auth_headers).headers['ETag']
+        
+        response = client.get('/api/wishlist', headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+    
+    def test_mutations_change_etag(self, client, auth_headers):
+        """Test that add, update and delete each bump the collection version"""
+        etags = [client.get('/api/wishlist', headers=auth_headers).headers['ETag']]
+        
+        added = client.post('/api/wishlist', headers=auth_headers, json={'rawg_id': 1, 'title': 'Game 1'})
+        etags.append(client.get('/api/wishlist', headers=auth_headers).headers['ETag'])
+        
+        game_id = added.json['game']['id']
+        client.patch(f'/api/wishlist/{game_id}', headers=auth_headers, json={'status': 'played'})
+        etags.append(client.get('/api/wishlist', headers=auth_headers).headers['ETag'])
+        
+        client.delete(f'/api/wishlist/{game_id}', headers=auth_headers)
+        etags.append(client.get('/api/wishlist', headers=auth_headers).headers['ETag'])
+        
+        assert len(set(etags)) == 4
+        response = client.get('/api/wishlist', headers={**auth_headers, 'If-None-Match': etags[1]})
+        assert response.status_code == 200
+    
+    def test_version_bump_is_a_single_upsert(self, client, auth_headers, app):
+        """Test that bumping creates the version row, then increments it, in one statement each"""
+        from sqlalchemy import event
+        from models import CollectionVersion, User
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        user_id = User.query.first().id
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            CollectionVersion.bump(user_id)
+            CollectionVersion.bump(user_id)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        assert CollectionVersion.current(user_id) == 2
+        assert len(statements) == 2
+        assert all('ON CONFLICT' in statement for statement in statements)
+    
+    def test_304_skips_games_query(self, client, auth_headers, app):
+        """Test that a conditional hit does not query the games table"""
+        from sqlalchemy import event
+        
+        etag = client.get('/api/wishlist', headers=auth_headers).headers['ETag']
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            response = client.get('/api/wishlist', headers={**auth_headers, 'If-None-Match': etag})
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        
+        assert response.status_code == 304
+        assert not any('FROM games' in statement for statement in statements)
+
+
+class TestWishlistPagination:
+    """Tests for server-side filtering, sorting and keyset pagination"""
+    
+    @staticmethod
+    def _add_games(client, auth_headers):
+        games = [
+            (1, 'Celeste', 4.5, '2018-01-25', 'played'),
+            (2, 'Hades', 4.5, '2020-09-17', 'wishlist'),
+            (3, 'Braid', None, '2008-08-06', 'wishlist'),
+            (4, 'Anodyne', 3.9, None, 'interested'),
+            (5, 'Dead Cells', 4.2, '2018-08-07', 'played')
+        ]
+        for rawg_id, title, rating, released, status in games:
+            client.post('/api/wishlist', headers=auth_headers, json={
+                'rawg_id': rawg_id, 'title': title, 'rating': rating,
+                'release_date': released, 'status': status
+            })
+    
+    @staticmethod
+    def _walk(client, auth_headers, query):
+        titles, cursor, pages = [], None, 0
+        while True:
+            url = f'/api/wishlist?{query}' + (f'&cursor={cursor}' if cursor else '')
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            titles.extend(game['title'] for game in response.json['games'])
+            cursor = response.json['next_cursor']
+            pages += 1
+            if cursor is None:
+                return titles, pages
+    
+    def test_pages_cover_collection_in_sort_order(self, client, auth_headers):
+        """Test that walking the cursors returns every game once, NULLs last"""
+        self._add_games(client, auth_headers)
+        
+        by_rating, pages = self._walk(client, auth_headers, 'sort=rating&limit=2')
+        by_title, _ = self._walk(client, auth_headers, 'sort=title&limit=2')
+        by_release, _ = self._walk(client, auth_headers, 'sort=release_date&limit=2')
+        by_added, _ = self._walk(client, auth_headers, 'limit=2')
+        
+        assert pages == 3
+        assert by_rating == ['Hades', 'Celeste', 'Dead Cells', 'Anodyne', 'Braid']
+        assert by_title == ['Anodyne', 'Braid', 'Celeste', 'Dead Cells', 'Hades']
+        assert by_release == ['Hades', 'Dead Cells', 'Celeste', 'Braid', 'Anodyne']
+        assert by_added == ['Dead Cells', 'Anodyne', 'Braid', 'Hades', 'Celeste']
+    
+    def test_status_filter(self, client, auth_headers):
+        """Test that status filters server-side, with or without pagination"""
+        self._add_games(client, auth_headers)
+        
+        played, _ = self._walk(client, auth_headers, 'status=played&sort=title&limit=1')
+        response = client.get('/api/wishlist?status=wishlist', headers=auth_headers)
+        
+        assert played == ['Celeste', 'Dead Cells']
+        assert [g['title'] for g in response.json['games']] == ['Braid', 'Hades']
+        assert 'next_cursor' not in response.json
+    
+    def test_invalid_parameters(self, client, auth_headers):
+        """Test that bad status, sort and cursor values are rejected"""
+        self._add_games(client, auth_headers)
+        cursor = client.get('/api/wishlist?sort=title&limit=1', headers=auth_headers).json['next_cursor']
+        
+        for query in ('status=owned', 'sort=price', 'cursor=not-a-cursor', f'sort=rating&cursor={cursor}'):
+            response = client.get(f'/api/wishlist?{query}', headers=auth_headers)
+            assert response.status_code == 400
+    
+    def test_pages_seek_on_keyset_indexes(self, client, auth_headers, app):
+        """Test that every page query is an index range scan, with no sort step"""
+        from sqlalchemy import event
+        self._add_games(client, auth_headers)
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            for sort in ('added_at', 'rating', 'release_date', 'title'):
+                for status in ('', '&status=played'):
+                    self._walk(client, auth_headers, f'sort={sort}&limit=1{status}')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        pages = [(s, p) for s, p in statements if s.startswith('SELECT games.id') and 'ORDER BY' in s]
+        assert pages
+        with db.engine.connect() as conn:
+            for statement, parameters in pages:
+                plan = ' '.join(row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters))
+                assert re.search(r'USING INDEX ix_games_user_\w+_id ', plan)
+                assert 'TEMP B-TREE' not in plan and 'SCAN' not in plan
+    
+    def test_etag_varies_with_query(self, client, auth_headers):
+        """Test that different pages of the same collection have different ETags"""
+        self._add_games(client, auth_headers)
+        
+        first = client.get('/api/wishlist?limit=2', headers=auth_headers)
+        second = client.get(f"/api/wishlist?limit=2&cursor={first.json['next_cursor']}", headers=auth_headers)
+        everything = client.get('/api/wishlist', headers=auth_headers)
+        
+        assert len({first.headers['ETag'], second.headers['ETag'], everything.headers['ETag']}) == 3
+
+
+class TestWishlistExport:
+    """Tests for the streaming collection export"""
+    
+    def test_ndjson_export(self, client, auth_headers):
+        """Test that NDJSON export streams one game per line"""
+        import json
+        TestWishlistPagination._add_games(client, auth_headers)
+        
+        response = client.get('/api/wishlist/export?format=ndjson&sort=title', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'attachment' in response.headers['Content-Disposition']
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [row['title'] for row in rows] == ['Anodyne', 'Braid', 'Celeste', 'Dead Cells', 'Hades']
+        assert 'user_id' not in rows[0]
+    
+    def test_csv_export(self, client, auth_headers):
+        """Test that CSV export has a header and joins list columns"""
+        import csv
+        import io
+        client.post('/api/wishlist', headers=auth_headers, json={
+            'rawg_id': 7, 'title': 'Hades, Supergiant', 'genres': ['Action', 'Roguelike'], 'status': 'played'
+        })
+        client.post('/api/wishlist', headers=auth_headers, json={'rawg_id': 8, 'title': 'Braid'})
+        
+        response = client.get('/api/wishlist/export?format=csv&status=played', headers=auth_headers)
+        
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert len(rows) == 1
+        assert rows[0]['title'] == 'Hades, Supergiant'
+        assert rows[0]['genres'] == 'Action; Roguelike'
+    
+    def test_csv_export_tolerates_unvalidated_lists(self, client, auth_headers):
+        """Test that non-string list items and non-list values are written, not fatal"""
+        import csv
+        import io
+        client.post('/api/wishlist', headers=auth_headers, json={
+            'rawg_id': 7, 'title': 'Hades', 'genres': [1, 2], 'platforms': 'PC'
+        })
+        client.post('/api/wishlist', headers=auth_headers, json={'rawg_id': 8, 'title': 'Braid', 'genres': None})
+        
+        response = client.get('/api/wishlist/export?format=csv&sort=title', headers=auth_headers)
+        
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [(row['title'], row['genres'], row['platforms']) for row in rows] == [
+            ('Braid', '', ''), ('Hades', '1; 2', 'PC')
+        ]
+    
+    def test_export_rejects_unknown_format(self, client, auth_headers):
+        """Test that only ndjson and csv are offered"""
+        response = client.get('/api/wishlist/export?format=xml', headers=auth_headers)
+        
+        assert response.status_code == 400
+
+
+class TestWishlistBulk:
+    """Tests for bulk import through upserts"""
+    
+    def test_bulk_creates_and_updates(self, client, auth_headers, app):
+        """Test that one request creates new games and updates saved ones"""
+        client.post('/api/wishlist', headers=auth_headers, json={'rawg_id': 1, 'title': 'Celeste'})
+        
+        response = client.post('/api/wishlist/bulk', headers=auth_headers, json={'games': [
+            {'rawg_id': 1, 'title': 'Celeste', 'status': 'played'},
+            {'rawg_id': 2, 'title': 'Hades', 'genres': ['Action']},
+            {'rawg_id': 3, 'title': 'Braid', 'status': 'interested'}
+        ]})
+        
+        assert response.status_code == 200
+        assert [r['result'] for r in response.json['results']] == ['updated', 'created', 'created']
+        assert (response.json['created'], response.json['updated']) == (2, 1)
+        with app.app_context():
+            games = {g.rawg_id: g for g in Game.query.all()}
+            assert len(games) == 3
+            assert games[1].status == 'played'
+            assert games[2].genres == ['Action']
+            assert games[2].added_at is not None
+    
+    def test_bulk_reports_invalid_and_duplicate_items(self, client, auth_headers, app):
+        """Test per-item errors without failing the valid items"""
+        response = client.post('/api/wishlist/bulk', headers=auth_headers, json=[
+            {'rawg_id': 1, 'title': 'Celeste'},
+            {'title': 'No id'},
+            {'rawg_id': 2, 'title': 'Hades', 'status': 'owned'},
+            {'rawg_id': 1, 'title': 'Celeste', 'status': 'played'}
+        ])
+        
+        results = response.json['results']
+        assert [r['result'] for r in results] == ['duplicate', 'error', 'error', 'created']
+        assert 'rawg_id' in results[1]['error']
+        with app.app_context():
+            assert [(g.rawg_id, g.status) for g in Game.query.all()] == [(1, 'played')]
+    
+    def test_bulk_rejects_badly_typed_items(self, client, auth_headers, app):
+        """Test that items with unstorable fields are errors while the rest are saved"""
+        response = client.post('/api/wishlist/bulk', headers=auth_headers, json=[
+            {'rawg_id': 1, 'title': 'Celeste', 'rating': 4.5, 'genres': ['Platformer']},
+            {'rawg_id': 2, 'title': 'x' * 256},
+            {'rawg_id': 3, 'title': 'Hades', 'rating': 'great'},
+            {'rawg_id': 4, 'title': 'Braid', 'genres': 'Puzzle'},
+            {'rawg_id': 5, 'title': 'Fez', 'platforms': [{'name': 'PC'}]},
+            {'rawg_id': 6, 'title': ['Inside']},
+            {'rawg_id': 7, 'title': 'Limbo', 'rating': 4},
+            {'rawg_id': 2 ** 64, 'title': 'Overflow'},
+            {'rawg_id': 0, 'title': 'Zero'}
+        ])
+        
+        assert response.status_code == 200
+        results = response.json['results']
+        assert [r['result'] for r in results] == [
+            'created', 'error', 'error', 'error', 'error', 'error', 'created', 'error', 'error'
+        ]
+        assert 'rawg_id' in results[7]['error'] and 'rawg_id' in results[8]['error']
+        assert 'title' in results[1]['error'] and 'title' in results[5]['error']
+        assert 'rating' in results[2]['error']
+        assert 'genres' in results[3]['error']
+        assert 'platforms' in results[4]['error']
+        with app.app_context():
+            assert sorted(g.rawg_id for g in Game.query.all()) == [1, 7]
+    
+    def test_bulk_uses_chunked_upserts(self, client, auth_headers, app):
+        """Test that a large import is written in a few statements"""
+        from sqlalchemy import event
+        app.config['WISHLIST_BULK_CHUNK_SIZE'] = 50
+        games = [{'rawg_id': i, 'title': f'Game {i}'} for i in range(1, 121)]
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = client.post('/api/wishlist/bulk', headers=auth_headers, json=games)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        assert response.json['created'] == 120
+        inserts = [s for s in statements if s.startswith('INSERT INTO games')]
+        assert len(inserts) == 3
+        assert all('ON CONFLICT' in s for s in inserts)
+    
+    def test_bulk_bumps_collection_version(self, client, auth_headers):
+        """Test that an import changes the wishlist ETag"""
+        before = client.get('/api/wishlist', headers=auth_headers).headers['ETag']
+        client.post('/api/wishlist/bulk', headers=auth_headers, json=[{'rawg_id': 1, 'title': 'Celeste'}])
+        
+        assert client.get('/api/wishlist', headers=auth_headers).headers['ETag'] != before
+    
+    def test_bulk_rejects_bad_payloads(self, client, auth_headers, app):
+        """Test that empty, non-list and oversized payloads are rejected"""
+        app.config['WISHLIST_BULK_MAX_ITEMS'] = 2
+        
+        for payload in ([], {'games': 'nope'}, [{'rawg_id': i, 'title': 'x'} for i in range(3)]):
+            response = client.post('/api/wishlist/bulk', headers=auth_headers, json=payload)
+            assert response.status_code == 400